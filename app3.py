@@ -2,121 +2,36 @@ import tkinter as tk
 from tkinter import messagebox, filedialog
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-import threading
 import re
-import time
-import datetime as dt
 import jdatetime
 import requests
-import pandas as pd
-from bs4 import BeautifulSoup
-
-# --- کلاس TGJUGoldFetcher: منطق استخراج داده (بدون تغییر) ---
-class TGJUGoldFetcher:
-    HEADERS = {"User-Agent": "Mozilla/5.0"}
-
-    def __init__(self, status_callback=None):
-        self.status_callback = status_callback
-        self.stop_flag = False
-
-    def _update_status(self, message):
-        if self.status_callback:
-            self.status_callback(message)
-
-    def stop(self):
-        self.stop_flag = True
-
-    def fetch_data(self, base_url, start_jalali_str, end_jalali_str, output_filepath):
-        self.stop_flag = False
-        try:
-            start_jalali_date = jdatetime.date.fromisoformat(start_jalali_str)
-            end_jalali_date = jdatetime.date.fromisoformat(end_jalali_str)
-
-            if start_jalali_date > end_jalali_date:
-                raise ValueError("تاریخ شروع باید قبل از یا برابر با تاریخ پایان باشد.")
-
-            start_gregorian_date = start_jalali_date.togregorian()
-            end_gregorian_date = end_jalali_date.togregorian()
-            self._update_status(f"در حال جمع‌آوری داده‌ها از {start_jalali_str} تا {end_jalali_str}...")
-            all_data = []
-            page = 1
-            reached_start_date_in_history = False 
-
-            while not self.stop_flag:
-                url = f"{base_url}?p={page}"
-                self._update_status(f"در حال دریافت صفحه {page}...")
-                try:
-                    html = requests.get(url, headers=self.HEADERS, timeout=15).text
-                except requests.exceptions.RequestException as e:
-                    raise IOError(f"خطا در ارتباط شبکه: {e}. لطفا اتصال اینترنت و آدرس URL را بررسی کنید.")
-
-                soup = BeautifulSoup(html, "html.parser")
-                rows = soup.findAll("tr")
-                if not rows and page > 1: break
-                page_processed_any_data_row = False
-                for r in rows:
-                    if self.stop_flag: break
-                    cols = [c.get_text(strip=True).replace(',', '') for c in r.findAll("td")]
-                    if len(cols) >= 6 and re.match(r"^\d{4}-\d{2}-\d{2}$", cols[0]):
-                        page_processed_any_data_row = True
-                        gdate = dt.date.fromisoformat(cols[0])
-                        if gdate < start_gregorian_date:
-                            reached_start_date_in_history = True
-                            break
-                        if gdate > end_gregorian_date: continue
-                        try:
-                            high = int(cols[1])
-                            low = int(cols[2])
-                            avg = (high + low) // 2
-                            all_data.append([gdate, high, low, avg])
-                        except (ValueError, IndexError):
-                            self._update_status(f"هشدار: داده نامعتبر در تاریخ {gdate}. نادیده گرفته شد.")
-                            continue
-                if reached_start_date_in_history or (not page_processed_any_data_row and page > 1): break
-                page += 1
-                time.sleep(0.5)
-
-            if self.stop_flag:
-                self._update_status("عملیات توسط کاربر متوقف شد.")
-                return False
-            if not all_data:
-                self._update_status("هیچ داده‌ای برای بازه تاریخ مشخص شده یافت نشد.")
-                return False
-
-            df = pd.DataFrame(all_data, columns=["GregorianDate", "High", "Low", "Average"])
-            df = df.drop_duplicates(subset=["GregorianDate"]).sort_values("GregorianDate")
-            df = df[(df["GregorianDate"] >= start_gregorian_date) & (df["GregorianDate"] <= end_gregorian_date)]
-            if df.empty:
-                self._update_status("هیچ داده‌ای پس از فیلتر نهایی در بازه تاریخ یافت نشد.")
-                return False
-
-            df["PersianDate"] = [jdatetime.date.fromgregorian(date=d) for d in df["GregorianDate"]]
-            df['Previous_Average'] = df['Average'].shift(1)
-            def get_trend(row):
-                if pd.isna(row['Previous_Average']): return "---"
-                if row['Average'] > row['Previous_Average']: return "صعودی"
-                if row['Average'] < row['Previous_Average']: return "نزولی"
-                return "بدون تغییر"
-            df["Trend"] = df.apply(get_trend, axis=1)
-            df = df[["PersianDate", "Low", "High", "Average", "Trend"]]
-            df.columns = ["تاریخ", "حداقل", "حداکثر", "میانگین", "روند"]
-            df.to_excel(output_filepath, index=False)
-            self._update_status(f"عملیات با موفقیت انجام شد. فایل در: {output_filepath} ذخیره شد.")
-            return True
-        except (ValueError, IOError, Exception) as e:
-            self._update_status(f"خطا: {e}")
-            return False
+from tgju_batch import symbol_name
+from tgju_cache import ResponseCache
+from tgju_chart import ChartPanel
+from tgju_checkpoint import CrawlCheckpoint
+from tgju_fetcher import TGJUGoldFetcher
+from tgju_jobs import Job, JobExecutor, StatusChannel
+from tgju_ratelimit import RateMemory
+from tgju_store import PriceStore
 
 # --- کلاس GoldApp: رابط کاربری مدرن ---
 class GoldApp:
     def __init__(self, master):
         self.master = master
         master.title("استخراج هوشمند قیمت طلا")
-        master.geometry("600x420")
-        master.resizable(False, False)
-        self.fetcher = TGJUGoldFetcher(self.update_status)
-        self.current_thread = None
+        master.geometry("640x820")
+        master.minsize(600, 760)
+        # پیام‌ها و پیشرفت ترد کارگر در یک صف جمع و هر STATUS_TICK_MS یک بار در رابط کاربری نمایش داده می‌شوند
+        self.status = StatusChannel()
+        self.fetcher = TGJUGoldFetcher(self.update_status, store=PriceStore(), checkpoint=CrawlCheckpoint(), seek=True,
+                                       cache=ResponseCache(), rate_memory=RateMemory(),
+                                       progress_callback=self.status.progress, source="auto", verify=True,
+                                       result_callback=self._on_result)
+        # یک ترد کارگر ماندگار؛ کارهای استخراج به ترتیب در صف اجرا می‌شوند
+        self.jobs = JobExecutor(on_change=lambda job: self.master.after(0, self._on_job_change, job))
         self._create_widgets()
+        master.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._drain_status()
 
     def _create_widgets(self):
         main_frame = ttk.Frame(self.master, padding=20)
@@ -125,7 +40,7 @@ class GoldApp:
         input_frame.pack(fill=X, pady=(0, 10), expand=YES)
         input_frame.grid_columnconfigure(1, weight=1)
 
-        ttk.Label(input_frame, text="آدرس صفحه (URL):").grid(row=0, column=0, padx=5, pady=10, sticky="w")
+        ttk.Label(input_frame, text="آدرس صفحه (چند URL با کاما):").grid(row=0, column=0, padx=5, pady=10, sticky="w")
         self.url_entry = ttk.Entry(input_frame, bootstyle="primary")
         self.url_entry.grid(row=0, column=1, columnspan=2, padx=5, pady=10, sticky="ew")
         self.url_entry.insert(0, "https://english.tgju.org/profile/sekee")
@@ -147,6 +62,14 @@ class GoldApp:
         self.browse_button = ttk.Button(input_frame, text="مرور", command=self.browse_output_path, bootstyle="secondary")
         self.browse_button.grid(row=3, column=2, padx=5, pady=10)
 
+        ttk.Label(input_frame, text="تعداد صفحات هم‌زمان:").grid(row=4, column=0, padx=5, pady=10, sticky="w")
+        self.workers_spinbox = ttk.Spinbox(input_frame, from_=1, to=8, width=5, bootstyle="primary")
+        self.workers_spinbox.grid(row=4, column=1, padx=5, pady=10, sticky="w")
+        self.workers_spinbox.set(1)
+        self.indicators_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(input_frame, text="شاخص‌های تکنیکال", variable=self.indicators_var,
+                        bootstyle="primary-round-toggle").grid(row=4, column=1, columnspan=2, padx=5, pady=10, sticky="e")
+
         action_frame = ttk.Frame(main_frame)
         action_frame.pack(fill=X, pady=10)
         action_frame.grid_columnconfigure((0,1), weight=1)
@@ -156,17 +79,41 @@ class GoldApp:
         self.stop_button.grid(row=0, column=1, padx=5, sticky="ew")
 
         status_frame = ttk.Labelframe(main_frame, text="وضعیت عملیات", padding=10)
-        status_frame.pack(fill=BOTH, expand=YES)
-        self.progress_bar = ttk.Progressbar(status_frame, mode='indeterminate', bootstyle="info-striped")
+        status_frame.pack(fill=X)
+        self.progress_bar = ttk.Progressbar(status_frame, mode='determinate', maximum=100, bootstyle="info-striped")
         self.progress_bar.pack(fill=X, padx=5, pady=5, expand=YES)
         self.status_label = ttk.Label(status_frame, text="آماده به کار", anchor="center")
         self.status_label.pack(fill=X, padx=5, pady=5, expand=YES)
+        self.warnings_label = ttk.Label(status_frame, text="", anchor="center", bootstyle="warning")
+        self.warnings_label.pack(fill=X, padx=5, expand=YES)
+        self.queue_label = ttk.Label(status_frame, text="", anchor="center", bootstyle="secondary")
+        self.queue_label.pack(fill=X, padx=5, expand=YES)
+
+        self.chart = ChartPanel(main_frame)
+        self.chart.pack(fill=BOTH, expand=YES, pady=(10, 0))
+
+    STATUS_TICK_MS = 100
 
     def update_status(self, message):
-        self.master.after(0, lambda: self.status_label.config(text=message))
+        # از هر تردی قابل فراخوانی است؛ Tk فقط در _drain_status لمس می‌شود
+        self.status.post(message)
+
+    def _drain_status(self):
+        if self.status.drain():
+            if self.status.message is not None:
+                self.status_label.config(text=self.status.message)
+            self.warnings_label.config(text=self.status.warnings_text())
+            done, total = self.status.done, self.status.total
+            self.progress_bar.config(value=100 * done / total if total else 0)
+        self.master.after(self.STATUS_TICK_MS, self._drain_status)
+
+    def _on_result(self, frames):
+        # از ترد کارگر فراخوانی می‌شود؛ رسم در ترد رابط کاربری انجام می‌شود
+        frames = {symbol_name(base_url): df for base_url, df in frames.items()}
+        self.master.after(0, self.chart.set_frames, frames)
 
     def browse_output_path(self):
-        filepath = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")], initialfile=self.output_path_entry.get())
+        filepath = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("Parquet files", "*.parquet"), ("Feather files", "*.feather"), ("JSON Lines files", "*.jsonl"), ("All files", "*.*")], initialfile=self.output_path_entry.get())
         if filepath:
             self.output_path_entry.delete(0, tk.END)
             self.output_path_entry.insert(0, filepath)
@@ -182,32 +129,59 @@ class GoldApp:
         if not re.match(r"^\d{4}-\d{2}-\d{2}$", start_date_str) or not re.match(r"^\d{4}-\d{2}-\d{2}$", end_date_str):
             messagebox.showerror("خطای فرمت", "لطفا تاریخ را با فرمت صحیح YYYY-MM-DD وارد کنید.", parent=self.master)
             return
-        self.start_button.config(state=DISABLED)
+        try:
+            max_workers = max(1, int(self.workers_spinbox.get()))
+        except ValueError:
+            messagebox.showerror("خطای ورودی", "تعداد صفحات هم‌زمان باید یک عدد صحیح باشد.", parent=self.master)
+            return
+        indicators = self.indicators_var.get()
+        # اگر کاری در حال اجرا باشد، کار جدید در صف قرار می‌گیرد
+        self.jobs.submit(output_filepath,
+                         lambda job: self._run_fetching_job(job, base_url, start_date_str, end_date_str, output_filepath,
+                                                            max_workers, indicators))
         self.stop_button.config(state=NORMAL)
-        self.progress_bar.start()
-        self.update_status("شروع عملیات استخراج...")
-        self.current_thread = threading.Thread(target=self._run_fetching_thread, args=(base_url, start_date_str, end_date_str, output_filepath))
-        self.current_thread.start()
 
-    def _run_fetching_thread(self, base_url, start_date_str, end_date_str, output_filepath):
-        success = self.fetcher.fetch_data(base_url, start_date_str, end_date_str, output_filepath)
-        self.master.after(0, self.reset_ui)
-        if success:
-            self.master.after(0, lambda: messagebox.showinfo("پایان عملیات", "داده‌ها با موفقیت استخراج شدند."))
-        elif not self.fetcher.stop_flag:
-            self.master.after(0, lambda: messagebox.showerror("خطا", "عملیات با خطا مواجه شد."))
+    def _run_fetching_job(self, job, base_url, start_date_str, end_date_str, output_filepath, max_workers, indicators):
+        self.fetcher.max_workers = max_workers
+        self.fetcher.indicators = indicators
+        self.status.reset()
+        self.update_status("شروع عملیات استخراج...")
+        # چند آدرس جدا شده با کاما یا فاصله در حالت دسته‌ای با یک استخر مشترک استخراج می‌شوند
+        base_urls = [u for u in re.split(r"[\s,]+", base_url) if u]
+        if len(base_urls) > 1:
+            return self.fetcher.fetch_batch(base_urls, start_date_str, end_date_str, output_filepath,
+                                            cancel_event=job.cancel_event)
+        # رویداد لغو خود کار به fetcher داده می‌شود تا توقف پیش از شروع استخراج هم اثر کند
+        return self.fetcher.fetch_data(base_url, start_date_str, end_date_str, output_filepath,
+                                       cancel_event=job.cancel_event)
+
+    def _on_job_change(self, job):
+        pending = len(self.jobs.pending)
+        self.queue_label.config(text=f"{pending} کار در صف انتظار" if pending else "")
+        if job.state in (Job.QUEUED, Job.RUNNING): return
+        idle = self.jobs.current is None and not pending
+        if idle:
+            self.reset_ui()
+        if job.state == Job.DONE and job.result:
+            if idle:
+                messagebox.showinfo("پایان عملیات", "داده‌ها با موفقیت استخراج شدند.", parent=self.master)
+        elif job.state in (Job.DONE, Job.FAILED):
+            messagebox.showerror("خطا", f"عملیات {job.description} با خطا مواجه شد.", parent=self.master)
 
     def reset_ui(self):
-        self.start_button.config(state=NORMAL)
         self.stop_button.config(state=DISABLED)
-        self.progress_bar.stop()
 
     def stop_fetching(self):
-        if self.current_thread and self.current_thread.is_alive():
-            self.fetcher.stop()
+        # کار در حال اجرا و همه کارهای صف لغو می‌شوند؛ درخواست‌ها و انتظارهای در جریان فوراً قطع می‌شوند
+        if self.jobs.current is not None or self.jobs.pending:
+            self.jobs.cancel_all()
             self.stop_button.config(state=DISABLED)
             self.update_status("درخواست توقف ارسال شد...")
 
+    def _on_close(self):
+        self.jobs.shutdown()
+        self.master.destroy()
+
 if __name__ == "__main__":
     try:
         requests.get("https://www.google.com", timeout=5)
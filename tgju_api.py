@@ -0,0 +1,253 @@
+"""
+سرویس محلی HTTP/JSON برای خواندن قیمت‌های ذخیره‌شده، بدون نیاز به استخراج و ساخت فایل اکسل در هر ابزار.
+
+نمونه:
+    python -m tgju_api --port 8765
+    curl "http://127.0.0.1:8765/prices?symbol=sekee&from=1403-01-01&to=1403-06-31"
+
+symbol نام کوتاه نماد (مثلا sekee) یا آدرس کامل صفحه آن است. from و to می‌توانند شمسی یا میلادی
+(YYYY-MM-DD یا YYYY/MM/DD) باشند؛ سال کمتر از 1700 شمسی در نظر گرفته می‌شود.
+"""
+import argparse
+import datetime as dt
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import jdatetime
+
+from tgju_jobs import JobExecutor
+from tgju_store import normalize_symbol
+
+SYMBOL_URL = "https://english.tgju.org/profile/{}"
+
+
+def symbol_url(symbol):
+    symbol = symbol.strip()
+    if "://" in symbol: return normalize_symbol(symbol)
+    return SYMBOL_URL.format(symbol)
+
+
+def parse_date(value):
+    """رشته تاریخ شمسی یا میلادی -> datetime.date میلادی."""
+    try:
+        year, month, day = (int(part) for part in value.strip().replace("/", "-").split("-"))
+        if year < 1700:
+            return jdatetime.date(year, month, day).togregorian()
+        return dt.date(year, month, day)
+    except (ValueError, AttributeError):
+        raise ValueError(f"تاریخ نامعتبر: {value}. قالب صحیح YYYY-MM-DD (شمسی یا میلادی) است.")
+
+
+# --- کلاس _SymbolIndex: نمایه مرتب قیمت‌های یک نماد در حافظه ---
+class _SymbolIndex:
+    def __init__(self, rows, version):
+        self.version = version
+        self.checked_at = time.monotonic()
+        # rows یک RowBuffer مرتب است و جستجوی بازه با bisect روی ستون ordinal آن انجام می‌شود؛ سطرها از قبل
+        # به شکل خروجی JSON ساخته می‌شوند
+        self.ordinals = rows.ordinals
+        jalali = []
+        if rows:
+            from tgju_transform import jalali_iso_strings
+            jalali = jalali_iso_strings(rows.columns()[0])
+        self.records = [
+            {"date": r.gregorian_date.isoformat(), "jalali": str(j), "high": r.high, "low": r.low, "average": r.average}
+            for r, j in zip(rows, jalali)
+        ]
+
+    def query(self, start_ordinal, end_ordinal):
+        return self.records[bisect_left(self.ordinals, start_ordinal):bisect_right(self.ordinals, end_ordinal)]
+
+
+# --- کلاس PriceService: منطق سرویس، مستقل از HTTP ---
+class PriceService:
+    """
+    پاسخ‌ها از نمایه حافظه‌ای هر نماد ساخته می‌شوند و پاسخ بازه‌های پرتکرار در یک LRU (به صورت JSON آماده)
+    نگه داشته می‌شود. هر index_ttl ثانیه نسخه داده‌های نماد در حافظه محلی بررسی می‌شود تا تغییرات فرایندهای
+    دیگر (مثلا tgju_daemon) دیده شوند. اگر بخشی از بازه در حافظه محلی نباشد، دریافت آن در پس‌زمینه با
+    fetcher شروع می‌شود و پاسخ فعلی با complete=false برگردانده می‌شود.
+    """
+
+    def __init__(self, fetcher, cache_size=256, index_ttl=30, refill_interval=300, fill=True):
+        self.fetcher = fetcher
+        self.fill = fill
+        self.store = fetcher.store
+        self.cache_size = cache_size
+        self.index_ttl = index_ttl
+        self.refill_interval = refill_interval
+        self._indexes = {}
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+        self._fills = {}
+        self.jobs = JobExecutor(self._on_job_change)
+
+    def _index(self, base_url):
+        with self._lock:
+            index = self._indexes.get(base_url)
+        if index is not None and time.monotonic() - index.checked_at < self.index_ttl:
+            return index
+        version = self.store.version(base_url)
+        if index is not None and index.version == version:
+            index.checked_at = time.monotonic()
+            return index
+        # کل تاریخچه نماد چند هزار سطر است و یک بار خوانده می‌شود
+        index = _SymbolIndex(self.store.load(base_url, dt.date.min, dt.date.max), version)
+        with self._lock:
+            self._indexes[base_url] = index
+        return index
+
+    def _on_job_change(self, job):
+        if job.state == job.FAILED:
+            self.fetcher._update_status(f"خطا در دریافت پس‌زمینه {job.description}: {job.error}")
+
+    def _schedule_fill(self, base_url, start, end):
+        """True اگر دریافت بازه در پس‌زمینه در جریان باشد."""
+        if not self.fill: return False
+        with self._lock:
+            last = self._fills.get(base_url)
+            if last is not None and (last == "running" or time.monotonic() - last < self.refill_interval):
+                return last == "running"
+            self._fills[base_url] = "running"
+
+        def fill(job):
+            self.fetcher._begin_run(job.cancel_event)
+            try:
+                with self.fetcher.metrics.run("api_fill", url=base_url):
+                    self.fetcher._fetch_with_store(base_url, start, end)
+            finally:
+                self.fetcher.transport.save_rates()
+                with self._lock:
+                    self._fills[base_url] = time.monotonic()
+                    self._indexes.pop(base_url, None)
+
+        self.jobs.submit(base_url, fill)
+        return True
+
+    def prices(self, symbol, start, end):
+        """بدنه JSON پاسخ به صورت bytes؛ ValueError برای ورودی نامعتبر."""
+        base_url = symbol_url(symbol)
+        if start > end:
+            raise ValueError("تاریخ شروع باید قبل از یا برابر با تاریخ پایان باشد.")
+        index = self._index(base_url)
+        key = (base_url, start, end, index.version)
+        with self._lock:
+            body = self._responses.get(key)
+            if body is not None:
+                self._responses.move_to_end(key)
+                return body
+
+        # روزهای آینده هنوز منتشر نشده‌اند و ناقص بودن پاسخ به خاطر آن‌ها نیست
+        missing = self.store.missing_ranges(base_url, start, min(end, dt.date.today()))
+        filling = bool(missing) and self._schedule_fill(base_url, missing[0][0], missing[-1][1])
+        rows = index.query(start.toordinal(), end.toordinal())
+        body = json.dumps({
+            "symbol": base_url,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "complete": not missing,
+            "missing": [[s.isoformat(), e.isoformat()] for s, e in missing],
+            "filling": filling,
+            "count": len(rows),
+            "rows": rows,
+        }, ensure_ascii=False).encode("utf-8")
+        # فقط پاسخ‌های کامل کش می‌شوند؛ پاسخ ناقص پس از تکمیل دریافت تغییر می‌کند
+        if not missing:
+            with self._lock:
+                self._responses[key] = body
+                while len(self._responses) > self.cache_size:
+                    self._responses.popitem(last=False)
+        return body
+
+    def close(self):
+        self.jobs.shutdown()
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status, message):
+            self._send(status, json.dumps({"error": message}, ensure_ascii=False).encode("utf-8"))
+
+        def do_GET(self):
+            parts = urlparse(self.path)
+            if parts.path != "/prices":
+                return self._error(404, "مسیر ناشناخته؛ فقط /prices?symbol=&from=&to= پشتیبانی می‌شود.")
+            query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+            if not query.get("symbol") or not query.get("from"):
+                return self._error(400, "پارامترهای symbol و from الزامی هستند.")
+            try:
+                start = parse_date(query["from"])
+                end = parse_date(query["to"]) if query.get("to") else dt.date.today()
+                body = service.prices(query["symbol"], start, end)
+            except ValueError as e:
+                return self._error(400, str(e))
+            self._send(200, body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(service, host="127.0.0.1", port=8765):
+    """سرور را در یک ترد پس‌زمینه اجرا می‌کند و شیء ThreadingHTTPServer را برمی‌گرداند."""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m tgju_api", description="سرویس محلی خواندن قیمت‌های ذخیره‌شده")
+    parser.add_argument("--host", default="127.0.0.1", help="آدرس شنود (پیش‌فرض: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="پورت (پیش‌فرض: 8765)")
+    parser.add_argument("--store", default="tgju_prices.sqlite3", help="مسیر پایگاه داده محلی قیمت‌ها")
+    parser.add_argument("--cache-dir", default="tgju_http_cache", help="پوشه کش دیسکی صفحات")
+    parser.add_argument("--no-fill", action="store_true", help="بازه‌های ناموجود از سایت دریافت نشوند")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from tgju_cache import ResponseCache
+    from tgju_fetcher import TGJUGoldFetcher
+    from tgju_ratelimit import RateMemory
+    from tgju_store import PriceStore
+
+    def print_status(message):
+        print(message, file=sys.stderr, flush=True)
+
+    fetcher = TGJUGoldFetcher(print_status, max_workers=4, store=PriceStore(args.store), seek=True,
+                              cache=ResponseCache(args.cache_dir), rate_memory=RateMemory(), source="auto")
+    service = PriceService(fetcher, fill=not args.no_fill)
+    server = serve(service, args.host, args.port)
+    print_status(f"سرویس روی http://{args.host}:{args.port}/prices در حال اجراست.")
+    try:
+        # ترد اصلی فقط تا Ctrl+C منتظر می‌ماند؛ درخواست‌ها در ترد سرور پاسخ داده می‌شوند
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        service.close()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
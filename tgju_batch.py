@@ -0,0 +1,142 @@
+import os
+import re
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+from tgju_export import write_frame, write_xlsx
+from tgju_store import RowBuffer
+
+# --- استخراج هم‌زمان چند نماد با یک استخر مشترک ---
+
+
+class _SymbolCrawl:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.host = urlparse(base_url).netloc
+        self.next_page = 1
+        self.window = 1
+        self.pending = deque()
+        self.rows = RowBuffer()
+        self.error = None
+        self.finished = False
+        self.pages_done = 0
+        self.pages_before_range = 0
+
+
+def symbol_name(base_url):
+    """نام کوتاه نماد از آخرین بخش آدرس (مثلا sekee برای .../profile/sekee)."""
+    return urlparse(base_url).path.rstrip("/").rsplit("/", 1)[-1] or urlparse(base_url).netloc
+
+
+def crawl_batch(fetcher, base_urls, start_gregorian_date, end_gregorian_date):
+    """
+    صفحات همه نمادها را از یک استخر مشترک با max_workers ترد دریافت می‌کند و برای هر نماد
+    لیست سطرها (یا خطا) را برمی‌گرداند: {base_url: (rows, error)}.
+    - محدودیت تطبیقی نرخ درخواست برای هر میزبان جداگانه اعمال می‌شود (TGJUTransport.limiter_for).
+    - ظرفیت استخر به صورت نوبتی (round-robin) بین نمادها تقسیم می‌شود تا یک نماد طولانی بقیه را معطل نکند.
+    - صفحات هر نماد مانند حالت تکی به ترتیب شماره صفحه پردازش می‌شوند.
+    """
+    crawls = [_SymbolCrawl(url) for url in dict.fromkeys(base_urls)]
+    cancelled = fetcher.cancel_event.child()
+    capacity = max(1, fetcher.max_workers)
+
+    def download(crawl, page):
+        if fetcher.stop_flag: return None
+        return fetcher._download_page(crawl.base_url, page, cancelled)
+
+    def finish(crawl, error=None):
+        crawl.finished = True
+        crawl.error = error
+        for _, future in crawl.pending:
+            future.cancel()
+        crawl.pending.clear()
+
+    def estimated_pages(crawl):
+        if crawl.finished: return crawl.pages_done
+        return fetcher._estimate_pages(crawl.pages_done, crawl.pages_before_range, crawl.rows,
+                                       start_gregorian_date, end_gregorian_date)
+
+    pool = ThreadPoolExecutor(max_workers=capacity)
+    turn = 0
+    try:
+        while not fetcher.stop_flag:
+            active = [c for c in crawls if not c.finished]
+            if not active: break
+            # پر کردن ظرفیت آزاد به صورت نوبتی: در هر دور حداکثر یک صفحه به هر نماد
+            in_flight = sum(len(c.pending) for c in active)
+            turn = (turn + 1) % len(active)
+            rotated = active[turn:] + active[:turn]
+            while in_flight < capacity:
+                added = False
+                for crawl in rotated:
+                    if in_flight >= capacity: break
+                    if len(crawl.pending) < crawl.window:
+                        crawl.pending.append((crawl.next_page, pool.submit(download, crawl, crawl.next_page)))
+                        crawl.next_page += 1
+                        in_flight += 1
+                        added = True
+                if not added: break
+
+            wait([f for c in active for _, f in c.pending], return_when=FIRST_COMPLETED)
+            for crawl in active:
+                while crawl.pending and crawl.pending[0][1].done() and not crawl.finished:
+                    page, future = crawl.pending.popleft()
+                    try:
+                        html = future.result()
+                    except IOError as e:
+                        fetcher._update_status(f"خطا در دریافت {symbol_name(crawl.base_url)}: {e}")
+                        finish(crawl, e)
+                        break
+                    if html is None: break
+                    page_rows, done = fetcher._process_page(html, page, start_gregorian_date, end_gregorian_date)
+                    crawl.rows.extend(page_rows)
+                    crawl.pages_done += 1
+                    if not crawl.rows:
+                        crawl.pages_before_range = crawl.pages_done
+                    if done:
+                        finish(crawl)
+                    else:
+                        crawl.window = min(capacity, crawl.window * 2)
+                    estimates = [estimated_pages(c) for c in crawls]
+                    fetcher._report_progress(sum(c.pages_done for c in crawls),
+                                             None if None in estimates else sum(estimates))
+    finally:
+        cancelled.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+    return {c.base_url: (c.rows, c.error) for c in crawls}
+
+
+def _unique_names(base_urls, max_length=31):
+    # نام شیت اکسل حداکثر ۳۱ کاراکتر و بدون کاراکترهای []:*?/\ است
+    names, used = {}, set()
+    for url in base_urls:
+        base = re.sub(r"[\[\]:*?/\\]", "_", symbol_name(url))[:max_length] or "sheet"
+        name, i = base, 2
+        while name.lower() in used:
+            suffix = f"_{i}"
+            name = base[:max_length - len(suffix)] + suffix
+            i += 1
+        used.add(name.lower())
+        names[url] = name
+    return names
+
+
+def write_batch_output(frames, output_path, output_format=None, cancelled=None):
+    """
+    اگر output_path فایل xlsx باشد، هر نماد در یک شیت جداگانه از همان فایل نوشته می‌شود؛
+    در غیر این صورت output_path یک پوشه در نظر گرفته می‌شود و برای هر نماد یک فایل جدا
+    (با قالب output_format، پیش‌فرض xlsx) ساخته می‌شود. لیست مسیرهای نوشته‌شده را برمی‌گرداند.
+    """
+    names = _unique_names(frames)
+    if output_path.lower().endswith(".xlsx") and output_format in (None, "xlsx"):
+        write_xlsx({names[url]: df for url, df in frames.items()}, output_path, cancelled)
+        return [output_path]
+    output_format = output_format or "xlsx"
+    os.makedirs(output_path, exist_ok=True)
+    paths = []
+    for url, df in frames.items():
+        path = os.path.join(output_path, f"{names[url]}.{output_format}")
+        write_frame(df, path, output_format, cancelled)
+        paths.append(path)
+    return paths
@@ -0,0 +1,729 @@
+"""
+بنچمارک‌های آفلاین مسیرهای پرمصرف برنامه.
+
+اجرا:
+    python tgju_bench.py transform [تعداد_روز]
+    python tgju_bench.py cold_start
+    python tgju_bench.py export [تعداد_روز] [تعداد_نماد]
+    python tgju_bench.py crawl [تعداد_روز] [تعداد_ترد] [تأخیر_ms] [درصد_خطای_5xx] [درصد_429] [parser]
+    python tgju_bench.py reparse [تعداد_روز] [تعداد_نماد] [parser]
+    python tgju_bench.py parsers [پوشه_صفحات_ذخیره‌شده]
+    python tgju_bench.py rows [تعداد_روز] [تعداد_نماد]
+    python tgju_bench.py sources [تعداد_روز] [طول_بازه_روز]
+    python tgju_bench.py integrity [تعداد_روز]
+    python tgju_bench.py chart [تعداد_روز] [تعداد_نماد] [عرض_پیکسل]
+"""
+import datetime as dt
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import jdatetime
+import pandas as pd
+
+from tgju_transform import build_output_frame
+
+
+def synthetic_rows(days, latest=dt.date(2025, 1, 1), seed=0):
+    """سطرهای [gdate, high, low, avg] به ترتیب صفحات سایت (جدید به قدیم)."""
+    rng = random.Random(seed)
+    rows = []
+    price = 50_000_000
+    for i in range(days):
+        price += rng.randint(-400_000, 400_000)
+        high = price + rng.randint(0, 300_000)
+        low = price - rng.randint(0, 300_000)
+        rows.append([latest - dt.timedelta(days=i), high, low, (high + low) // 2])
+    return rows
+
+
+def legacy_output_frame(all_data, start_gregorian_date, end_gregorian_date):
+    """پیاده‌سازی سطر به سطر قبلی fetch_data؛ فقط برای مقایسه خروجی و زمان نگه داشته شده است."""
+    df = pd.DataFrame(all_data, columns=["GregorianDate", "High", "Low", "Average"])
+    df = df.drop_duplicates(subset=["GregorianDate"]).sort_values("GregorianDate")
+    df = df[(df["GregorianDate"] >= start_gregorian_date) & (df["GregorianDate"] <= end_gregorian_date)]
+    df["PersianDate"] = [jdatetime.date.fromgregorian(date=d) for d in df["GregorianDate"]]
+    df['Previous_Average'] = df['Average'].shift(1)
+    def get_trend(row):
+        if pd.isna(row['Previous_Average']): return "---"
+        if row['Average'] > row['Previous_Average']: return "صعودی"
+        if row['Average'] < row['Previous_Average']: return "نزولی"
+        return "بدون تغییر"
+    df["Trend"] = df.apply(get_trend, axis=1)
+    df = df[["PersianDate", "Low", "High", "Average", "Trend"]]
+    df.columns = ["تاریخ", "حداقل", "حداکثر", "میانگین", "روند"]
+    return df
+
+
+def _cells(df):
+    return [list(df.columns)] + [[str(v) for v in row] for row in df.itertuples(index=False)]
+
+
+def _best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def bench_transform(days=3650 * 5, repeat=3):
+    rows = synthetic_rows(days)
+    start, end = rows[-1][0] + dt.timedelta(days=30), rows[0][0]
+    legacy_time, legacy = _best_of(lambda: legacy_output_frame(rows, start, end), repeat)
+    fast_time, fast = _best_of(lambda: build_output_frame(rows, start, end), repeat)
+    # مقادیر سلول‌هایی که در فایل خروجی نوشته می‌شوند باید یکسان باشند
+    same = _cells(legacy) == _cells(fast)
+    print(f"transform: {days} سطر | قبلی {legacy_time * 1000:.1f}ms | برداری {fast_time * 1000:.1f}ms "
+          f"| سرعت {legacy_time / fast_time:.1f}x | خروجی یکسان: {same}")
+    return same
+
+
+# سقف زمان شروع سرد رابط خط فرمان (import ماژول‌های tgju_cli و tgju_fetcher در یک مفسر تازه)
+COLD_START_BUDGET_MS = 400
+# ماژول‌هایی که نباید در شروع سرد رابط خط فرمان بارگذاری شوند
+COLD_START_FORBIDDEN = ("tkinter", "ttkbootstrap", "pandas", "numpy", "bs4", "lxml")
+
+
+def bench_cold_start(repeat=5):
+    code = ("import sys, time; t = time.perf_counter(); import tgju_cli, tgju_fetcher; "
+            "print((time.perf_counter() - t) * 1000); print(','.join(sorted(sys.modules)))")
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = float("inf")
+    total_best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True).stdout
+        total_best = min(total_best, (time.perf_counter() - t0) * 1000)
+        import_ms, modules = out.splitlines()
+        best = min(best, float(import_ms))
+    loaded = [m for m in COLD_START_FORBIDDEN if m in modules.split(",")]
+    ok = total_best <= COLD_START_BUDGET_MS and not loaded
+    print(f"cold_start: import {best:.0f}ms | کل فرایند {total_best:.0f}ms | سقف {COLD_START_BUDGET_MS}ms "
+          f"| ماژول‌های سنگین بارگذاری‌شده: {', '.join(loaded) or 'هیچ'} | {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # ویندوز
+        return None
+    # ru_maxrss در لینوکس بر حسب کیلوبایت و در macOS بر حسب بایت است
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _export_once(output_format, days, symbols, directory):
+    """در یک مفسر جداگانه اجرا می‌شود تا اوج حافظه هر قالب مستقل از بقیه اندازه‌گیری شود."""
+    from tgju_batch import write_batch_output
+
+    frames = {}
+    for i in range(symbols):
+        rows = synthetic_rows(days, seed=i)
+        frames[f"https://bench.invalid/profile/symbol{i}"] = build_output_frame(rows, rows[-1][0], rows[0][0])
+    before = _peak_rss_mb()
+    t0 = time.perf_counter()
+    if output_format == "legacy_xlsx":
+        # مسیر قبلی: pandas.ExcelWriter با openpyxl که کل کارپوشه را در حافظه می‌سازد
+        with pd.ExcelWriter(os.path.join(directory, "out.xlsx"), engine="openpyxl") as writer:
+            for j, df in enumerate(frames.values()):
+                df.to_excel(writer, sheet_name=f"symbol{j}", index=False)
+    elif output_format == "xlsx":
+        write_batch_output(frames, os.path.join(directory, "out.xlsx"))
+    else:
+        write_batch_output(frames, directory, output_format)
+    elapsed = time.perf_counter() - t0
+    after = _peak_rss_mb()
+    size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(directory) for f in files)
+    print(json.dumps({"seconds": elapsed, "rss_before": before, "rss_peak": after, "bytes": size}))
+
+
+def bench_export(days=3650 * 3, symbols=5):
+    from tgju_export import FORMATS
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"export: {symbols} نماد × {days} روز")
+    print(f"{'قالب':<12}{'زمان':>10}{'اوج RSS':>12}{'افزایش RSS':>12}{'حجم':>10}")
+    for output_format in ("legacy_xlsx",) + FORMATS:
+        directory = tempfile.mkdtemp(prefix="tgju_bench_")
+        try:
+            code = f"import tgju_bench; tgju_bench._export_once({output_format!r}, {days}, {symbols}, {directory!r})"
+            result = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        if result.returncode != 0:
+            reason = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "?"
+            print(f"{output_format:<12}  اجرا نشد: {reason}")
+            continue
+        r = json.loads(result.stdout.strip().splitlines()[-1])
+        peak = f"{r['rss_peak']:.0f}MB" if r["rss_peak"] is not None else "n/a"
+        grown = f"{r['rss_peak'] - r['rss_before']:.0f}MB" if r["rss_peak"] is not None else "n/a"
+        print(f"{output_format:<12}{r['seconds'] * 1000:>8.0f}ms{peak:>12}{grown:>12}{r['bytes'] / 1024:>8.0f}KB")
+
+
+# --- کلاس StandInServer: جایگزین محلی صفحات تاریخچه TGJU برای بنچمارک بدون شبکه ---
+class StandInServer:
+    """
+    یک سرور HTTP محلی که صفحات تاریخچه را با صفحه‌بندی ?p=N مانند سایت ارائه می‌کند.
+    - به طور پیش‌فرض صفحات از synthetic_rows ساخته می‌شوند؛ اگر recorded_dir داده شود، فایل‌های
+      {N}.html آن پوشه (صفحات ذخیره‌شده از سایت) برگردانده می‌شوند و صفحات بعد از آخرین فایل خالی‌اند.
+    - latency تأخیر هر پاسخ (ثانیه)، error_rate احتمال پاسخ 503 و rate_limit_rate احتمال پاسخ 429
+      (با هدر Retry-After) است.
+    - padding_kb حجم HTML اضافه (منو، اسکریپت و ...) هر صفحه تا تجزیه به اندازه صفحات واقعی هزینه داشته باشد.
+    - فید JSON تاریخچه (tgju_sources.JsonFeedSource) در feed_url با پارامترهای start، length، from و to ارائه
+      می‌شود؛ اگر recorded_dir فایل feed.json (یک پاسخ ضبط‌شده کامل فید) داشته باشد سطرهای آن برگردانده می‌شوند.
+      feed_fail_after تعداد پاسخ‌های سالم فید قبل از پاسخ 404 است (None یعنی همیشه سالم، 0 یعنی فید وجود ندارد).
+    - damaged_pages: {شماره صفحه: "short" یا "invalid"}؛ اولین پاسخ آن صفحه ناقص (نیمی از سطرها) یا با یک عدد
+      نامعتبر است و پاسخ‌های بعدی سالم‌اند (برای tgju_integrity).
+    """
+
+    def __init__(self, days=3650, rows_per_page=30, latency=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 recorded_dir=None, padding_kb=40, seed=0, feed_fail_after=None, damaged_pages=None):
+        self.rows = synthetic_rows(days, seed=seed)
+        self.rows_per_page = rows_per_page
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.recorded_dir = recorded_dir
+        self.padding = "<script>var x = 1;</script>" + "<div class='nav'><a href='#'>link</a></div>" * (padding_kb * 24)
+        self.requests = 0
+        self.status_counts = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._server = None
+        self.feed_fail_after = feed_fail_after
+        self.feed_requests = 0
+        self.damaged_pages = dict(damaged_pages or {})
+
+    def page_html(self, page, damage=None):
+        if self.recorded_dir:
+            try:
+                with open(os.path.join(self.recorded_dir, f"{page}.html"), encoding="utf-8") as f:
+                    return f.read()
+            except FileNotFoundError:
+                return "<html><body><table></table></body></html>"
+        cells = []
+        rows = self.rows[(page - 1) * self.rows_per_page:page * self.rows_per_page]
+        if damage == "short":
+            rows = rows[:len(rows) // 2]
+        for i, (gdate, high, low, avg) in enumerate(rows):
+            jdate = jdatetime.date.fromgregorian(date=gdate).strftime("%Y/%m/%d")
+            high_cell = "-" if damage == "invalid" and i == len(rows) // 2 else f"{high:,}"
+            cells.append(f"<tr><td>{gdate.isoformat()}</td><td>{high_cell}</td><td>{low:,}</td><td>{avg:,}</td>"
+                         f"<td>{abs(high - low):,}</td><td>{jdate}</td></tr>")
+        return (f"<html><head><title>history</title></head><body>{self.padding}<table class='table'>"
+                f"<thead><tr><th>Date</th><th>High</th><th>Low</th><th>Close</th><th>Change</th><th>Jalali</th></tr>"
+                f"</thead><tbody>{''.join(cells)}</tbody></table>{self.padding}</body></html>")
+
+    def feed_rows(self):
+        """سطرهای فید به ترتیب نزولی تاریخ: [بازگشایی، کمترین، بیشترین، پایانی، تغییر، درصد، میلادی، شمسی]."""
+        if self.recorded_dir:
+            try:
+                with open(os.path.join(self.recorded_dir, "feed.json"), encoding="utf-8") as f:
+                    return json.load(f)["data"]
+            except FileNotFoundError:
+                return []
+        # مانند صفحات HTML در _pages نگه داشته می‌شود تا پاک کردن آن پس از تغییر rows اثر کند
+        if "feed" not in self._pages:
+            rows = []
+            for gdate, high, low, avg in self.rows:
+                jdate = jdatetime.date.fromgregorian(date=gdate).strftime("%Y/%m/%d")
+                rows.append([f"{avg:,}", f"{low:,}", f"{high:,}", f"{avg:,}", f"{abs(high - low):,}", "0%",
+                             gdate.strftime("%Y/%m/%d"), jdate])
+            self._pages["feed"] = rows
+        return self._pages["feed"]
+
+    def feed_json(self, query):
+        start, length = int(query.get("start", 0)), int(query.get("length", 30))
+        data = all_rows = self.feed_rows()
+        # تاریخ‌های YYYY/MM/DD و YYYY-MM-DD به صورت رشته قابل مقایسه‌اند
+        if query.get("from"):
+            data = [r for r in data if r[6].replace("/", "-") >= query["from"]]
+        if query.get("to"):
+            data = [r for r in data if r[6].replace("/", "-") <= query["to"]]
+        payload = {"draw": 1, "recordsTotal": len(all_rows), "recordsFiltered": len(data),
+                   "data": data[start:start + length]}
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    @property
+    def feed_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/feed/{{symbol}}"
+
+    def _respond(self, handler):
+        parts = urlparse(handler.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        content_type = "text/html; charset=utf-8"
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            if parts.path.startswith("/feed/"):
+                self.feed_requests += 1
+                content_type = "application/json; charset=utf-8"
+                if self.feed_fail_after is not None and self.feed_requests > self.feed_fail_after:
+                    roll, body = 1.0, None
+                else:
+                    body = self.feed_json(query)
+            else:
+                page = int(query.get("p", "1") or 1)
+                damage = self.damaged_pages.pop(page, None)
+                if damage:
+                    body = self.page_html(page, damage).encode("utf-8")
+                else:
+                    if page not in self._pages:
+                        self._pages[page] = self.page_html(page).encode("utf-8")
+                    body = self._pages[page]
+        if self.latency:
+            time.sleep(self.latency)
+        if roll < self.rate_limit_rate:
+            status, body, extra = 429, b"Too Many Requests", {"Retry-After": "1"}
+        elif roll < self.rate_limit_rate + self.error_rate:
+            status, body, extra = 503, b"Service Unavailable", {}
+        elif body is None:
+            status, body, extra = 404, b"Not Found", {}
+        else:
+            status, extra = 200, {}
+        with self._lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        for name, value in extra.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._respond(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/profile/bench"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def bench_crawl(days=3650, workers=4, latency_ms=20, error_pct=0, rate_limit_pct=0, parser="strainer"):
+    """
+    اجرای کامل TGJUGoldFetcher.fetch_data روی StandInServer (بدون حافظه محلی، کش و جستجوی صفحه شروع)
+    و گزارش صفحه و سطر در ثانیه، زمان تجزیه هر صفحه، پردازش نهایی و نوشتن خروجی.
+    """
+    from tgju_fetcher import TGJUGoldFetcher
+
+    server = StandInServer(days, latency=latency_ms / 1000, error_rate=error_pct / 100,
+                           rate_limit_rate=rate_limit_pct / 100).start()
+    fetcher = TGJUGoldFetcher(max_workers=workers, requests_per_second=0, parser=parser)
+    fetcher.transport.backoff_base = 0.05
+    oldest, newest = server.rows[-1][0], server.rows[0][0]
+    start = jdatetime.date.fromgregorian(date=oldest).isoformat()
+    end = jdatetime.date.fromgregorian(date=newest).isoformat()
+    directory = tempfile.mkdtemp(prefix="tgju_bench_")
+    try:
+        t0 = time.perf_counter()
+        ok = fetcher.fetch_data(server.base_url, start, end, os.path.join(directory, "out.xlsx"))
+        elapsed = time.perf_counter() - t0
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        fetcher.transport.close()
+        server.stop()
+
+    snapshot = fetcher.metrics.snapshot()
+    seconds = {stage: t["seconds"] for stage, t in snapshot["timings"].items()}
+    totals = {c["name"]: c["value"] for c in snapshot["counters"] if not c["labels"]}
+    pages, rows = totals.get("pages", 0), totals.get("rows", 0)
+    crawl_time = elapsed - seconds.get("frame", 0) - seconds.get("export", 0)
+    parse_time = seconds.get("parse", 0) + seconds.get("rows", 0)
+    statuses = ", ".join(f"{code}:{n}" for code, n in sorted(server.status_counts.items()))
+    print(f"crawl: {days} روز | {workers} ترد | تأخیر {latency_ms}ms | خطای 5xx {error_pct}% | 429 {rate_limit_pct}% "
+          f"| parser {parser}")
+    print(f"  درخواست‌ها {server.requests} ({statuses}) | صفحات {pages} | کل {elapsed:.2f}s")
+    print(f"  {pages / crawl_time:.1f} صفحه/ثانیه | {rows / crawl_time:.0f} سطر/ثانیه "
+          f"| تجزیه {parse_time / max(1, pages) * 1000:.2f}ms/صفحه "
+          f"| پردازش نهایی {seconds.get('frame', 0) * 1000:.0f}ms (شمسی {seconds.get('jalali', 0) * 1000:.0f}ms) "
+          f"| خروجی {seconds.get('export', 0) * 1000:.0f}ms")
+    expected_pages = -(-days // server.rows_per_page) + 1
+    ok = ok and pages == expected_pages and rows == days
+    print(f"  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def bench_reparse(days=3650, symbols=4, parser="strainer"):
+    """تجزیه دوباره آرشیو صفحات کش‌شده (tgju_pipeline) با ۱ پردازه و با تعداد بیشتر پردازه‌ها."""
+    from tgju_cache import ResponseCache
+    from tgju_pipeline import reparse_archive
+
+    directory = tempfile.mkdtemp(prefix="tgju_bench_")
+    try:
+        cache = ResponseCache(directory)
+        base_urls = [f"https://bench.invalid/profile/symbol{i}" for i in range(symbols)]
+        pages = 0
+        for i, base_url in enumerate(base_urls):
+            server = StandInServer(days, seed=i)
+            for page in range(1, -(-days // server.rows_per_page) + 1):
+                cache.store(f"{base_url}?p={page}", server.page_html(page).encode("utf-8"), "utf-8")
+                pages += 1
+        start, end = dt.date(1900, 1, 1), dt.date(2100, 1, 1)
+        cpus = os.cpu_count() or 1
+        print(f"reparse: {symbols} نماد × {days} روز = {pages} صفحه | parser {parser} | {cpus} هسته")
+        baseline = None
+        ok = True
+        for processes in sorted({1, 2, 4, cpus}):
+            elapsed, results = _best_of(lambda: reparse_archive(cache, base_urls, start, end, parser, processes), 1)
+            if baseline is None:
+                baseline, reference = elapsed, results
+            same = results == reference and all(len(rows) == days for rows in results.values())
+            ok = ok and same
+            print(f"  {processes} پردازه: {elapsed:.2f}s | {pages / elapsed:.0f} صفحه/ثانیه "
+                  f"| سرعت {baseline / elapsed:.2f}x | خروجی یکسان: {same}")
+        return ok
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# صفحات ساختگی با حالت‌های دشوار: سطرهای داده‌ای باید در همه backendها مانند html.parser استخراج شوند و
+# سطرهای داخل script و comment نادیده گرفته شوند. td و tr بسته‌نشده اینجا نیست: html.parser آن‌ها را تو در تو
+# می‌سازد و هیچ سطری پیدا نمی‌کند، پس مرجع برابری نیست (صفحات سایت تگ‌ها را می‌بندند)
+_ROW = "<tr><td>{date}</td><td>{high}</td><td>{low}</td><td>1</td><td>0</td><td>1403/01/01</td></tr>"
+MESSY_PAGES = {
+    "entities": "<table><tr><td>2024-03-02</td><td>1&#44;250&nbsp;</td><td>&#x31;,100</td><td>&amp;</td>"
+                "<td>&lt;b&gt;</td><td>1402/12/12</td></tr></table>",
+    "nested_spans": "<table><tr><td><span class='d'>2024-03-03</span></td><td><span><b>1,300</b></span></td>"
+                    "<td> <span>1,2</span><span>00</span> </td><td>x</td><td>y</td><td>z</td></tr></table>",
+    "uppercase": "<TABLE><TBODY><TR CLASS='r'><TD>2024-03-04</TD><TD>1,400</TD><TD>1,350</TD><TD>1</TD><TD>0</TD>"
+                 "<TD>1402/12/14</TD></TR></TBODY></TABLE>",
+    "script_comment_decoys": ("<script>var t = '" + _ROW.format(date="2001-01-01", high="9", low="9") + "';</script>"
+                              "<!-- " + _ROW.format(date="2001-01-02", high="9", low="9") + " -->"
+                              "<style>tr td { color: red; }</style><table>"
+                              + _ROW.format(date="2024-03-05", high="1,500", low="1,450") + "</table>"),
+    "header_and_short_rows": ("<table><tr><th>Date</th><th>High</th></tr><tr><td>2024-03-08</td><td>1</td></tr>"
+                              + _ROW.format(date="2024-03-09", high="1,800", low="1,750") + "</table>"),
+}
+
+
+def bench_parsers(recorded_dir=None, pages=40):
+    """
+    برابری backendهای tgju_parsers.PARSERS با html.parser (مسیر قبلی) روی صفحات ذخیره‌شده، صفحات
+    StandInServer (سالم، ناقص و با عدد نامعتبر) و MESSY_PAGES. recorded_dir پوشه فایل‌های {N}.html صفحات
+    ذخیره‌شده از سایت است. اگر سطرهای هر backend با html.parser یکی نباشد FAIL.
+    """
+    from tgju_parsers import PARSERS, get_parser
+
+    documents = {}
+    if recorded_dir:
+        for name in sorted(os.listdir(recorded_dir)):
+            if name.endswith(".html"):
+                with open(os.path.join(recorded_dir, name), encoding="utf-8") as f:
+                    documents[f"saved/{name}"] = f.read()
+        if not documents:
+            print(f"parsers: هیچ فایل .html در {recorded_dir} نیست.")
+            return False
+    server = StandInServer(pages * 30)
+    for page in range(1, pages + 1):
+        documents[f"stand_in/{page}"] = server.page_html(page)
+    documents["stand_in/short"] = server.page_html(1, "short")
+    documents["stand_in/invalid"] = server.page_html(1, "invalid")
+    documents.update((f"messy/{name}", html) for name, html in MESSY_PAGES.items())
+
+    reference = get_parser("html.parser")
+    expected = {name: list(reference(html)) for name, html in documents.items()}
+    print(f"parsers: {len(documents)} صفحه | {sum(map(len, expected.values()))} سطر مرجع (html.parser)")
+    ok = True
+    for backend in PARSERS:
+        try:
+            parser = get_parser(backend)
+        except ValueError as e:
+            print(f"  {backend:<12} نصب نیست: {e}")
+            ok = False
+            continue
+        t0 = time.perf_counter()
+        mismatched = [name for name, html in documents.items() if list(parser(html)) != expected[name]]
+        elapsed = time.perf_counter() - t0
+        print(f"  {backend:<12} {elapsed / len(documents) * 1000:.2f}ms/صفحه | صفحات متفاوت: {len(mismatched)}"
+              + (f" ({', '.join(mismatched[:5])})" if mismatched else ""))
+        ok = ok and not mismatched
+    print(f"  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def _accumulate_rows(parsed_symbols, buffer_factory):
+    # مانند _process_page: هر سطر از رشته‌های خروجی parser با date و int تازه به صورت PriceRow ساخته می‌شود
+    from tgju_store import PriceRow
+
+    buffers = []
+    for parsed in parsed_symbols:
+        all_data = buffer_factory()
+        for date_str, high_str, low_str in parsed:
+            high, low = int(high_str), int(low_str)
+            all_data.append(PriceRow(dt.date.fromisoformat(date_str), high, low, (high + low) // 2))
+        buffers.append(all_data)
+    return buffers
+
+
+def bench_rows(days=3650 * 3, symbols=10):
+    """
+    حافظه جمع کردن سطرهای چند نماد (مانند fetch_batch همه نمادها تا ساخت جدول‌ها نگه داشته می‌شوند) و
+    اوج حافظه تا ساخت جدول‌های خروجی: لیست PriceRowها در برابر RowBuffer ستونی.
+    """
+    import tracemalloc
+
+    from tgju_store import RowBuffer
+
+    parsed_symbols = [[(gdate.isoformat(), str(high), str(low)) for gdate, high, low, _ in synthetic_rows(days, seed=i)]
+                      for i in range(symbols)]
+    start, end = dt.date(1900, 1, 1), dt.date(2100, 1, 1)
+    total = symbols * days
+    print(f"rows: {symbols} نماد × {days} روز = {total} سطر")
+    results = {}
+    for name, factory in (("list", list), ("RowBuffer", RowBuffer)):
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        buffers = _accumulate_rows(parsed_symbols, factory)
+        held = tracemalloc.get_traced_memory()[0] - base
+        frames = [build_output_frame(rows, start, end) for rows in buffers]
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+        results[name] = frames
+        del buffers
+        print(f"  {name:<10} سطرهای جمع‌شده {held / 2 ** 20:6.1f}MB ({held / total:4.0f} بایت/سطر) "
+              f"| اوج تا ساخت جدول‌ها {peak / 2 ** 20:6.1f}MB | {elapsed * 1000:.0f}ms")
+    same = all(_cells(a) == _cells(b) for a, b in zip(results["list"], results["RowBuffer"]))
+    print(f"  خروجی یکسان: {same}")
+    return same
+
+
+def bench_sources(days=3650, range_days=3650):
+    """
+    دریافت یک بازه از StandInServer با منابع مختلف (tgju_sources): حجم و تعداد درخواست صفحات HTML در برابر
+    فید JSON، و یکسان بودن سطرها؛ از جمله منبع auto وقتی فید وجود ندارد یا پس از یک پاسخ از کار می‌افتد.
+    """
+    from tgju_fetcher import TGJUGoldFetcher
+    from tgju_sources import AutoSource, JsonFeedSource
+
+    end = dt.date(2025, 1, 1)
+    start = end - dt.timedelta(days=range_days - 1)
+    print(f"sources: بازه {range_days} روز از تاریخچه {days} روزه")
+    cases = (
+        ("html", lambda server: "html", None),
+        ("json", lambda server: JsonFeedSource(server.feed_url), None),
+        ("auto (بدون فید)", lambda server: AutoSource(JsonFeedSource(server.feed_url)), 0),
+        ("auto (قطع فید)", lambda server: AutoSource(JsonFeedSource(server.feed_url)), 1),
+    )
+    reference = None
+    ok = True
+    for name, make_source, feed_fail_after in cases:
+        server = StandInServer(days, padding_kb=40, feed_fail_after=feed_fail_after).start()
+        fetcher = TGJUGoldFetcher(requests_per_second=0, seek=True, source=make_source(server))
+        try:
+            t0 = time.perf_counter()
+            rows = list(fetcher.iter_rows(server.base_url, start, end))
+            elapsed = time.perf_counter() - t0
+        finally:
+            fetcher.transport.close()
+            server.stop()
+        totals = {}
+        for counter in fetcher.metrics.snapshot()["counters"]:
+            totals[counter["name"]] = totals.get(counter["name"], 0) + counter["value"]
+        if reference is None:
+            reference = rows, totals
+        same = rows == reference[0] and len(rows) == min(days, range_days)
+        ok = ok and same
+        print(f"  {name:<16} درخواست‌ها {totals.get('requests', 0):>4} | حجم {totals.get('bytes', 0) / 1024:>8.0f}KB "
+              f"| {elapsed:.2f}s | کاهش حجم {reference[1]['bytes'] / max(1, totals.get('bytes', 0)):.1f}x "
+              f"| سطرهای یکسان: {same}")
+    return ok
+
+
+def bench_integrity(days=3650):
+    """
+    بررسی یکپارچگی (tgju_integrity) روی تاریخچه‌ای با جمعه‌ها، تعطیلات ثابت و چند تعطیلی خارج از تقویم
+    (مانند تعطیلات قمری) و چند صفحه که بار اول ناقص یا با عدد نامعتبر برگردانده می‌شوند: خروجی باید با
+    استخراج سالم یکی باشد و فقط همان صفحات دوباره دریافت شوند؛ با و بدون حافظه محلی و کش دیسکی. با حافظه
+    محلی یک اجرای دوم هم انجام می‌شود که باید همان خروجی را بدهد (روز ناموجود نباید پوشش‌داده‌شده ثبت شود).
+    """
+    from tgju_cache import ResponseCache
+    from tgju_fetcher import TGJUGoldFetcher
+    from tgju_integrity import TradingCalendar
+    from tgju_store import PriceStore
+
+    calendar = TradingCalendar()
+    rng = random.Random(1)
+    rows = [r for r in synthetic_rows(days) if calendar.is_trading_day(r[0]) and rng.random() > 0.03]
+    data_pages = -(-len(rows) // 30)
+    # فقط صفحاتی که در این تاریخچه وجود دارند (صفحه آخر کوتاه بودنش عادی است و آسیب نمی‌بیند)
+    damaged = {page: kind for page, kind in {3: "short", 17: "invalid", 18: "short", 60: "invalid"}.items()
+               if page < data_pages}
+    start = jdatetime.date.fromgregorian(date=rows[-1][0]).isoformat()
+    end = jdatetime.date.fromgregorian(date=rows[0][0]).isoformat()
+    expected_pages = data_pages + 1
+    print(f"integrity: {len(rows)} سطر از {days} روز | صفحات آسیب‌دیده {damaged}")
+    directory = tempfile.mkdtemp(prefix="tgju_bench_")
+    outputs = {}
+    ok = True
+    try:
+        for name, damage, verify, store, cache in (
+                ("سالم", None, False, False, False), ("بدون بررسی", damaged, False, False, False),
+                ("با بررسی", damaged, True, False, False), ("با بررسی و حافظه محلی", damaged, True, True, False),
+                ("با بررسی و کش", damaged, True, False, True),
+                ("با بررسی، کش و حافظه محلی", damaged, True, True, True)):
+            server = StandInServer(days, damaged_pages=damage).start()
+            server.rows = rows
+            case = os.path.join(directory, str(len(outputs)))
+            runs = 2 if store else 1
+            try:
+                for run in range(runs):
+                    fetcher = TGJUGoldFetcher(requests_per_second=0, verify=verify,
+                                              store=PriceStore(f"{case}.sqlite3") if store else None,
+                                              cache=ResponseCache(f"{case}_cache") if cache else None)
+                    path = f"{case}_{run}.csv"
+                    requests_before = server.requests
+                    try:
+                        t0 = time.perf_counter()
+                        fetcher.fetch_data(server.base_url, start, end, path)
+                        elapsed = time.perf_counter() - t0
+                    finally:
+                        fetcher.transport.close()
+                    with open(path, encoding="utf-8-sig") as f:
+                        output = f.read()
+                    if run == 0:
+                        outputs[name] = output
+                    same = output == outputs["سالم"]
+                    requests = server.requests - requests_before
+                    extra = requests - expected_pages
+                    timings = fetcher.metrics.snapshot()["timings"]
+                    label = name if run == 0 else "  (اجرای دوم)"
+                    print(f"  {label:<26} درخواست‌ها {requests:>4} (اضافه {extra}) | سطرها {output.count(chr(10)) - 1:>5} "
+                          f"| بررسی {timings.get('verify', {}).get('seconds', 0) * 1000:.0f}ms | {elapsed:.2f}s "
+                          f"| خروجی سالم: {same}")
+                    if verify:
+                        ok = ok and same and (run > 0 or extra == len(damaged))
+            finally:
+                server.stop()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def _reference_lttb(points, threshold):
+    """پیاده‌سازی سطر به سطر LTTB (الگوریتم اصلی Steinarsson)؛ فقط برای مقایسه خروجی tgju_chart.lttb."""
+    n = len(points)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        if i == threshold - 3:
+            next_start, next_end = n - 1, n
+        avg_x = sum(p[0] for p in points[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(p[1] for p in points[next_start:next_end]) / (next_end - next_start)
+        best, best_area = None, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((points[a][0] - avg_x) * (points[j][1] - points[a][1])
+                       - (points[a][0] - points[j][0]) * (avg_y - points[a][1]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def bench_chart(days=3650 * 30, symbols=3, width=800):
+    """
+    کاهش نقاط نمودار (tgju_chart): یکسان بودن lttb برداری با پیاده‌سازی سطر به سطر، زمان آماده‌سازی یک رسم
+    کل بازه و ۲۰ گام بزرگ‌نمایی/جابه‌جایی (فقط پنجره قابل مشاهده دوباره کاهش می‌یابد) در برابر رسم همه نقاط.
+    """
+    import numpy as np
+    from tgju_chart import ChartView, lttb
+    from tgju_transform import build_output_frame, jalali_ordinals
+
+    rng = random.Random(2)
+    sample = [(float(i), rng.gauss(0, 1) + i * 0.01) for i in range(5000)]
+    x, y = (np.array(col) for col in zip(*sample))
+    same = all(list(lttb(x, y, t)) == _reference_lttb(sample, t) for t in (3, 10, 777, 4999))
+
+    frames = {}
+    for i in range(symbols):
+        rows = synthetic_rows(days, seed=i)
+        frames[f"s{i}"] = build_output_frame(rows, rows[-1][0], rows[0][0])
+    t0 = time.perf_counter()
+    series = [(name, jalali_ordinals(df["تاریخ"]), df["میانگین"].to_numpy()) for name, df in frames.items()]
+    convert = time.perf_counter() - t0
+    view = ChartView()
+    view.set_series(series)
+    total = sum(len(df) for df in frames.values())
+    print(f"chart: {symbols} نماد × {days} روز = {total:,} نقطه | عرض {width}px | lttb یکسان با مرجع: {same}")
+
+    full, (drawn, _, _, visible) = _best_of(lambda: view.visible(width), 3)
+    naive, _ = _best_of(lambda: [np.column_stack((x, y)).ravel().tolist() for _, x, y in view.series], 3)
+    steps = []
+    for step in range(20):
+        t0 = time.perf_counter()
+        if step < 12:
+            view.zoom(0.7, 0.6)
+        else:
+            view.pan(0.3)
+        result = view.visible(width)
+        steps.append(time.perf_counter() - t0)
+    points = sum(len(xs) for _, xs, _ in drawn)
+    print(f"  تبدیل تاریخ {convert * 1000:.0f}ms | رسم کل بازه: {points:,} نقطه از {visible:,} در {full * 1000:.1f}ms "
+          f"(مختصات همه نقاط {naive * 1000:.0f}ms)")
+    print(f"  بزرگ‌نمایی/جابه‌جایی: میانگین {sum(steps) / len(steps) * 1000:.2f}ms، بیشینه {max(steps) * 1000:.2f}ms "
+          f"| پنجره آخر {result[3]:,} نقطه")
+    ok = same and points <= symbols * width and max(steps) < 0.05
+    print(f"  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+BENCHMARKS = {
+    "transform": bench_transform,
+    "cold_start": bench_cold_start,
+    "export": bench_export,
+    "crawl": bench_crawl,
+    "reparse": bench_reparse,
+    "parsers": bench_parsers,
+    "rows": bench_rows,
+    "sources": bench_sources,
+    "integrity": bench_integrity,
+    "chart": bench_chart,
+}
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "transform"
+    if name not in BENCHMARKS:
+        # -h/--help راهنما را نشان می‌دهد؛ نام ناشناخته خطاست
+        print(__doc__.strip())
+        sys.exit(0 if name in ("-h", "--help") else 2)
+    args = [int(a) if a.lstrip("-").isdigit() else a for a in sys.argv[2:]]
+    sys.exit(0 if BENCHMARKS[name](*args) is not False else 1)
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlparse, urlunparse
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    series TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    sha TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    encoding TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    epoch TEXT,
+    stored_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_series ON entries (series, page);
+"""
+
+_FIRST_DATE_RE = re.compile(rb"<td[^>]*>\s*(\d{4}-\d{2}-\d{2})", re.IGNORECASE)
+
+
+def page_epoch(body):
+    """
+    «نسخه» تاریخچه یک نماد: تاریخ جدیدترین سطر صفحه ۱. تا وقتی سطر جدیدی اضافه نشده، مرز صفحات
+    عمیق‌تر جابه‌جا نمی‌شود و نسخه کش‌شده آن‌ها معتبر است.
+    """
+    match = _FIRST_DATE_RE.search(body)
+    return match.group(1).decode("ascii") if match else hashlib.sha256(body).hexdigest()
+
+
+def split_page_url(url):
+    """(آدرس بدون پارامتر p، شماره صفحه)"""
+    parts = urlparse(url)
+    page = int(parse_qs(parts.query).get("p", ["1"])[0] or 1)
+    return urlunparse(parts._replace(query="")), page
+
+
+# --- کلاس ResponseCache: کش دیسکی پاسخ‌های خام صفحات ---
+class ResponseCache:
+    """
+    بدنه پاسخ‌ها بر اساس sha256 محتوا در پوشه objects ذخیره می‌شوند (بدنه‌های یکسان یک بار ذخیره
+    می‌شوند) و یک نمایه SQLite آدرس را به بدنه، ETag/Last-Modified و زمان دریافت نگاشت می‌کند.
+
+    - صفحه ۱ هر نماد فقط fresh_ttl ثانیه تازه است و بعد از آن با درخواست شرطی بازبینی می‌شود.
+    - صفحات عمیق‌تر تا deep_ttl ثانیه تازه‌اند، به شرط آن‌که با همان «نسخه» صفحه ۱ فعلی (page_epoch)
+      ذخیره شده باشند؛ با اضافه شدن یک روز جدید همه سطرها یک خانه جابه‌جا می‌شوند و صفحات قدیمی‌تر
+      دیگر با مرز صفحات فعلی هم‌خوانی ندارند.
+    - اگر حجم کل از max_bytes بیشتر شود، کم‌استفاده‌ترین ورودی‌ها (LRU) حذف می‌شوند.
+    """
+
+    def __init__(self, directory="tgju_http_cache", max_bytes=200 * 1024 * 1024, fresh_ttl=300, deep_ttl=30 * 86400):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fresh_ttl = fresh_ttl
+        self.deep_ttl = deep_ttl
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"))
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _object_path(self, sha):
+        return os.path.join(self.directory, "objects", sha[:2], sha)
+
+    def lookup(self, url):
+        """(بدنه، encoding، آیا تازه است، هدرهای درخواست شرطی) یا None اگر ورودی وجود نداشته باشد."""
+        series, page = split_page_url(url)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT sha, encoding, etag, last_modified, epoch, stored_at FROM entries WHERE url = ?",
+                               (url,)).fetchone()
+            if row is None: return None
+            sha, encoding, etag, last_modified, epoch, stored_at = row
+            try:
+                with open(self._object_path(sha), "rb") as f:
+                    body = f.read()
+            except OSError:
+                conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE url = ?", (now, url))
+            if page == 1:
+                fresh = now - stored_at < self.fresh_ttl
+            else:
+                first = conn.execute("SELECT epoch, stored_at FROM entries WHERE series = ? AND page = 1",
+                                     (series,)).fetchone()
+                fresh = (now - stored_at < self.deep_ttl and first is not None and first[0] == epoch
+                         and now - first[1] < self.fresh_ttl)
+        headers = {}
+        if etag: headers["If-None-Match"] = etag
+        if last_modified: headers["If-Modified-Since"] = last_modified
+        return body, encoding, fresh, headers
+
+    def store(self, url, body, encoding=None, etag=None, last_modified=None):
+        series, page = split_page_url(url)
+        sha = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            if page == 1:
+                epoch = page_epoch(body)
+            else:
+                # صفحه عمیق با نسخه فعلی صفحه ۱ همان نماد برچسب می‌خورد
+                first = conn.execute("SELECT epoch FROM entries WHERE series = ? AND page = 1", (series,)).fetchone()
+                epoch = first[0] if first else None
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (url, series, page, sha, size, encoding, etag, last_modified, epoch, stored_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, series, page, sha, len(body), encoding, etag, last_modified, epoch, now, now))
+            self._evict(conn)
+
+    def series_pages(self, base_url):
+        """[(شماره صفحه، مسیر فایل بدنه، encoding)] صفحات کش‌شده یک نماد به ترتیب شماره صفحه."""
+        series, _ = split_page_url(base_url)
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT page, sha, encoding FROM entries WHERE series = ? ORDER BY page",
+                                (series,)).fetchall()
+        return [(page, self._object_path(sha), encoding) for page, sha, encoding in rows
+                if os.path.exists(self._object_path(sha))]
+
+    def touch(self, url):
+        """پاسخ 304: بدنه کش‌شده هنوز معتبر است و زمان دریافت (و نسخه صفحه عمیق) به‌روز می‌شود."""
+        series, page = split_page_url(url)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE entries SET stored_at = ?, last_access = ? WHERE url = ?", (now, now, url))
+            if page != 1:
+                conn.execute("UPDATE entries SET epoch = (SELECT epoch FROM entries WHERE series = ? AND page = 1)"
+                             " WHERE url = ?", (series, url))
+
+    def discard(self, url):
+        """ورودی url حذف می‌شود (مثلا صفحه‌ای که ناقص ذخیره شده) تا دریافت بعدی از شبکه باشد."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT sha FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None: return
+            conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            if conn.execute("SELECT 1 FROM entries WHERE sha = ?", row).fetchone() is None:
+                try:
+                    os.remove(self._object_path(row[0]))
+                except OSError:
+                    pass
+
+    def _evict(self, conn):
+        objects = conn.execute("SELECT sha, MAX(size), MAX(last_access) FROM entries GROUP BY sha").fetchall()
+        total = sum(size for _, size, _ in objects)
+        if total <= self.max_bytes: return
+        for sha, size, _ in sorted(objects, key=lambda o: o[2]):
+            conn.execute("DELETE FROM entries WHERE sha = ?", (sha,))
+            try:
+                os.remove(self._object_path(sha))
+            except OSError:
+                pass
+            total -= size
+            if total <= self.max_bytes: break
@@ -0,0 +1,223 @@
+import datetime as dt
+import tkinter as tk
+
+import jdatetime
+import numpy as np
+import ttkbootstrap as ttk
+
+# --- نمودار قیمت داخل برنامه: کاهش نقاط با LTTB به اندازه عرض پیکسلی و بزرگ‌نمایی/جابه‌جایی روی Canvas ---
+# در هر رسم فقط نقاط پنجره قابل مشاهده (با searchsorted روی محور تاریخ) انتخاب و به حداکثر یک نقطه برای هر
+# پیکسل عرض کاهش داده می‌شوند، پس هزینه رسم به عرض نمودار بستگی دارد نه به طول تاریخچه یا تعداد نمادها.
+
+COLORS = ["#2780e3", "#ff7518", "#3fb618", "#9954bb", "#ff0039", "#373a3c"]
+# کوچک‌ترین پنجره قابل بزرگ‌نمایی (روز)
+MIN_WINDOW_DAYS = 7
+ZOOM_STEP = 0.8
+
+
+def lttb(x, y, threshold):
+    """
+    اندیس threshold نقطه از سری (x مرتب) با روش Largest-Triangle-Three-Buckets: نقطه اول و آخر حفظ می‌شوند و از
+    هر سطل نقطه‌ای انتخاب می‌شود که با نقطه انتخاب‌شده سطل قبل و میانگین سطل بعد بزرگ‌ترین مثلث را بسازد؛ شکل
+    سری (قله‌ها و دره‌ها) با تعداد نقاط بسیار کمتر حفظ می‌شود. اگر سری کوتاه‌تر باشد همه اندیس‌ها برگردانده می‌شوند.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # سطل‌های میانی: [edges[i], edges[i+1]) روی نقاط 1 تا n-2
+    every = (n - 2) / (threshold - 2)
+    edges = np.append((np.arange(threshold - 2) * every).astype(np.int64) + 1, n - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1]) / counts, x[-1])
+    avg_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1]) / counts, y[-1])
+
+    selected = [0] * threshold
+    selected[-1] = n - 1
+    # دو برابر مساحت مثلث (a، نقطه، میانگین سطل بعد) تابعی خطی از نقطه است: |dy * x - dx * y + c|؛ حلقه روی
+    # سطل‌ها ترتیبی است (هر انتخاب به انتخاب قبلی بستگی دارد)، پس کار هر دور به چند عمل numpy محدود شده است
+    lows, highs = edges[:-1].tolist(), edges[1:].tolist()
+    next_x, next_y = avg_x[1:].tolist(), avg_y[1:].tolist()
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = lows[i], highs[i]
+        ax, ay = float(x[a]), float(y[a])
+        dx, dy = next_x[i] - ax, next_y[i] - ay
+        a = lo + int(np.abs(dy * x[lo:hi] - dx * y[lo:hi] + (dx * ay - dy * ax)).argmax())
+        selected[i + 1] = a
+    return np.array(selected)
+
+
+def nice_ticks(low, high, count=5):
+    """حدود count مقدار گرد (۱، ۲ یا ۵ ضربدر توانی از ۱۰) بین low و high برای برچسب محور."""
+    if high <= low:
+        return [low]
+    raw = (high - low) / count
+    magnitude = 10 ** np.floor(np.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw)
+    first = np.ceil(low / step) * step
+    return list(np.arange(first, high + step / 2, step))
+
+
+# --- کلاس ChartView: سری‌ها، پنجره قابل مشاهده و تبدیل به مختصات پیکسل (مستقل از Tk) ---
+class ChartView:
+    def __init__(self):
+        # [(نام، ordinal میلادی به صورت float، قیمت)] هر سری به ترتیب تاریخ
+        self.series = []
+        self.window = None
+
+    def set_series(self, series):
+        self.series = [(name, np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+                       for name, x, y in series if len(x)]
+        self.reset()
+
+    def bounds(self):
+        if not self.series: return None
+        return min(x[0] for _, x, _ in self.series), max(x[-1] for _, x, _ in self.series)
+
+    def reset(self):
+        self.window = self.bounds()
+
+    def _clamp(self, start, end):
+        first, last = self.bounds()
+        width = min(max(end - start, MIN_WINDOW_DAYS), last - first)
+        start = min(max(start, first), last - width)
+        return start, start + width
+
+    def zoom(self, factor, anchor):
+        """بزرگ‌نمایی (factor < 1) یا کوچک‌نمایی حول نسبت anchor (۰ تا ۱) از عرض پنجره."""
+        if self.window is None: return
+        start, end = self.window
+        center = start + (end - start) * anchor
+        width = (end - start) * factor
+        self.window = self._clamp(center - width * anchor, center - width * anchor + width)
+
+    def pan(self, fraction):
+        """جابه‌جایی پنجره به اندازه fraction از عرض آن (مثبت یعنی به سمت تاریخ‌های جدیدتر)."""
+        if self.window is None: return
+        start, end = self.window
+        shift = (end - start) * fraction
+        self.window = self._clamp(start + shift, end + shift)
+
+    def visible(self, points):
+        """
+        (سری‌های کاهش‌یافته [(نام، x، y)]، کمترین و بیشترین قیمت پنجره، تعداد نقاط پنجره). از هر طرف یک نقطه
+        بیرون از پنجره هم نگه داشته می‌شود تا خط تا لبه نمودار ادامه یابد.
+        """
+        if self.window is None: return [], 0.0, 0.0, 0
+        start, end = self.window
+        result = []
+        low, high, total = np.inf, -np.inf, 0
+        for name, x, y in self.series:
+            inner_lo = np.searchsorted(x, start, side="left")
+            inner_hi = np.searchsorted(x, end, side="right")
+            if inner_hi > inner_lo:
+                low = min(low, y[inner_lo:inner_hi].min())
+                high = max(high, y[inner_lo:inner_hi].max())
+                total += inner_hi - inner_lo
+            lo, hi = max(0, inner_lo - 1), min(len(x), inner_hi + 1)
+            if hi - lo < 2: continue
+            idx = lttb(x[lo:hi], y[lo:hi], points)
+            result.append((name, x[lo:hi][idx], y[lo:hi][idx]))
+        if total == 0: return result, 0.0, 0.0, 0
+        return result, float(low), float(high), total
+
+
+# --- کلاس ChartPanel: نمودار روی tk.Canvas ---
+class ChartPanel(ttk.Labelframe):
+    """
+    set_frames({نام: DataFrame خروجی}) ستون میانگین هر نماد را رسم می‌کند. چرخ ماوس بزرگ‌نمایی حول نشانگر،
+    کشیدن با کلیک چپ جابه‌جایی و دوبار کلیک بازگشت به کل بازه است. رسم‌های پشت سر هم در یک رسم ادغام می‌شوند.
+    """
+
+    MARGIN_LEFT, MARGIN_RIGHT, MARGIN_TOP, MARGIN_BOTTOM = 90, 15, 25, 30
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, text="نمودار قیمت", padding=5, **kwargs)
+        self.view = ChartView()
+        self.canvas = tk.Canvas(self, background="white", highlightthickness=0, height=220)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self._redraw_pending = None
+        self._drag_x = None
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<MouseWheel>", lambda e: self._on_wheel(e, e.delta > 0))
+        self.canvas.bind("<Button-4>", lambda e: self._on_wheel(e, True))
+        self.canvas.bind("<Button-5>", lambda e: self._on_wheel(e, False))
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<Double-Button-1>", lambda e: (self.view.reset(), self.redraw()))
+
+    def set_frames(self, frames):
+        from tgju_transform import jalali_ordinals
+        self.view.set_series((name, jalali_ordinals(df["تاریخ"]), df["میانگین"].to_numpy())
+                             for name, df in frames.items())
+        self.redraw()
+
+    def _plot_width(self):
+        return max(1, self.canvas.winfo_width() - self.MARGIN_LEFT - self.MARGIN_RIGHT)
+
+    def _on_wheel(self, event, zoom_in):
+        anchor = min(max((event.x - self.MARGIN_LEFT) / self._plot_width(), 0.0), 1.0)
+        self.view.zoom(ZOOM_STEP if zoom_in else 1 / ZOOM_STEP, anchor)
+        self.redraw()
+
+    def _on_press(self, event):
+        self._drag_x = event.x
+
+    def _on_drag(self, event):
+        if self._drag_x is None: return
+        self.view.pan((self._drag_x - event.x) / self._plot_width())
+        self._drag_x = event.x
+        self.redraw()
+
+    def redraw(self):
+        if self._redraw_pending is None:
+            self._redraw_pending = self.after_idle(self._draw)
+
+    def _draw(self):
+        self._redraw_pending = None
+        canvas = self.canvas
+        canvas.delete("all")
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        left, top = self.MARGIN_LEFT, self.MARGIN_TOP
+        right, bottom = width - self.MARGIN_RIGHT, height - self.MARGIN_BOTTOM
+        if right - left < 10 or bottom - top < 10: return
+        series, low, high, total = self.view.visible(right - left)
+        if not series:
+            canvas.create_text(width / 2, height / 2, text="پس از استخراج، نمودار اینجا نمایش داده می‌شود.",
+                               fill="#868e96")
+            return
+        if high <= low:
+            low, high = low - 1, high + 1
+        pad = (high - low) * 0.05
+        low, high = low - pad, high + pad
+        start, end = self.view.window
+        x_scale = (right - left) / max(end - start, 1e-9)
+        y_scale = (bottom - top) / (high - low)
+
+        ticks = nice_ticks(low, high)
+        for value in ticks:
+            y = bottom - (value - low) * y_scale
+            canvas.create_line(left, y, right, y, fill="#f1f3f5")
+        drawn = 0
+        for i, (name, xs, ys) in enumerate(series):
+            coords = np.empty(2 * len(xs))
+            coords[0::2] = left + (xs - start) * x_scale
+            coords[1::2] = bottom - (ys - low) * y_scale
+            canvas.create_line(*coords.tolist(), fill=COLORS[i % len(COLORS)], width=1.5)
+            drawn += len(xs)
+        # نقاط کناری بیرون از پنجره روی حاشیه‌ها می‌افتند و با حاشیه سفید پوشانده می‌شوند
+        canvas.create_rectangle(0, 0, left, height, fill="white", outline="")
+        canvas.create_rectangle(right, 0, width, height, fill="white", outline="")
+        canvas.create_rectangle(left, top, right, bottom, outline="#ced4da")
+
+        for value in ticks:
+            canvas.create_text(left - 5, bottom - (value - low) * y_scale, text=f"{value:,.0f}", anchor="e",
+                               fill="#495057")
+        for ordinal in np.linspace(start, end, 5):
+            label = jdatetime.date.fromgregorian(date=dt.date.fromordinal(int(round(ordinal)))).isoformat()
+            canvas.create_text(left + (ordinal - start) * x_scale, bottom + 5, text=label, anchor="n", fill="#495057")
+        for i, (name, _, _) in enumerate(series):
+            canvas.create_text(left + 8 + 110 * i, top - 12, text=name, anchor="w", fill=COLORS[i % len(COLORS)])
+        canvas.create_text(right, top - 12, text=f"{min(drawn, total):,} نقطه از {total:,}", anchor="e", fill="#868e96")
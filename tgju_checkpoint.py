@@ -0,0 +1,71 @@
+import datetime as dt
+import hashlib
+import json
+import os
+
+from tgju_store import PriceRow, normalize_symbol
+
+
+# --- کلاس CrawlCheckpoint: ذخیره وضعیت استخراج برای ادامه پس از خطا یا توقف ---
+class CrawlCheckpoint:
+    """
+    برای هر (آدرس، تاریخ شروع) یک فایل JSON نگه می‌دارد که شامل تاریخ پایان، آخرین صفحه کامل‌شده و سطرهای
+    جمع‌آوری‌شده تا آن صفحه است. تاریخ پایان جزو کلید نیست چون پیش‌فرض آن «امروز» است: اجرای بعدی با همان
+    آدرس و شروع، اگر تاریخ پایانش همان یا بعد از تاریخ ذخیره‌شده باشد، از صفحه بعدی ادامه می‌دهد و روزهای
+    جدیدتر را جدا دریافت می‌کند (TGJUGoldFetcher._fetch_pages).
+    """
+
+    def __init__(self, directory="tgju_checkpoints", every_pages=5):
+        self.directory = directory
+        # هر چند صفحه یک بار وضعیت روی دیسک نوشته شود
+        self.every_pages = every_pages
+
+    def _path(self, base_url, start_date):
+        key = f"{normalize_symbol(base_url)}|{start_date.isoformat()}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def load(self, base_url, start_date, end_date):
+        """
+        وضعیت ذخیره‌شده را برمی‌گرداند یا None اگر نقطه بازیابی وجود نداشته باشد یا تاریخ پایانش بعد از end_date
+        باشد (سطرهای آن برای بازه کوتاه‌تر کافی نیستند).
+        """
+        try:
+            with open(self._path(base_url, start_date), encoding="utf-8") as f:
+                state = json.load(f)
+            saved_end = dt.date.fromisoformat(state["end_date"])
+        except (OSError, ValueError, KeyError):
+            return None
+        if saved_end > end_date: return None
+        newest = state.get("newest_seen_date")
+        return {
+            "end_date": saved_end,
+            "last_page": state["last_page"],
+            "newest_seen_date": dt.date.fromisoformat(newest) if newest else None,
+            # نقاط بازیابی قدیمی‌تر فقط از صفحات HTML ساخته می‌شدند
+            "source": state.get("source", "html"),
+            "rows": [PriceRow(dt.date.fromisoformat(d), high, low, avg) for d, high, low, avg in state["rows"]],
+        }
+
+    def save(self, base_url, start_date, end_date, last_page, rows, newest_seen_date=None, source="html"):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(base_url, start_date)
+        state = {
+            "base_url": normalize_symbol(base_url),
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "last_page": last_page,
+            "newest_seen_date": newest_seen_date.isoformat() if newest_seen_date else None,
+            "source": source,
+            "rows": [[gdate.isoformat(), high, low, avg] for gdate, high, low, avg in rows],
+        }
+        # نوشتن در فایل موقت و جایگزینی اتمیک تا قطع برنامه فایل نیمه‌کاره باقی نگذارد
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def clear(self, base_url, start_date):
+        try:
+            os.remove(self._path(base_url, start_date))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,110 @@
+"""
+رابط خط فرمان بدون رابط گرافیکی، مناسب اجرا روی سرور و cron.
+
+نمونه:
+    python -m tgju_cli https://english.tgju.org/profile/sekee --from 1403-01-01 -o gold.xlsx
+    python -m tgju_cli URL1 URL2 --from 1403-01-01 --to 1403-06-31 -o out_dir --format csv
+    python -m tgju_cli URL1 URL2 --from 1393-01-01 -o out_dir --from-cache --processes 8
+
+برخلاف app3.py، tkinter/ttkbootstrap import نمی‌شوند، بررسی اتصال به اینترنت انجام نمی‌شود و
+pandas فقط هنگام ساخت فایل خروجی بارگذاری می‌شود.
+"""
+import argparse
+import sys
+
+from tgju_export import FORMATS
+from tgju_parsers import PARSERS
+from tgju_sources import SOURCES
+
+DEFAULT_URL = "https://english.tgju.org/profile/sekee"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m tgju_cli", description="استخراج قیمت طلا از TGJU بدون رابط گرافیکی")
+    parser.add_argument("urls", nargs="*", default=[DEFAULT_URL], help=f"آدرس صفحه نماد (پیش‌فرض: {DEFAULT_URL})")
+    parser.add_argument("--from", dest="start", required=True, help="تاریخ شروع شمسی YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", help="تاریخ پایان شمسی YYYY-MM-DD (پیش‌فرض: امروز)")
+    parser.add_argument("-o", "--output", required=True, help="مسیر فایل خروجی؛ برای چند نماد می‌تواند پوشه باشد")
+    parser.add_argument("--format", choices=FORMATS, help="قالب خروجی (پیش‌فرض: از روی پسوند فایل)")
+    parser.add_argument("--workers", type=int, default=4, help="تعداد صفحات هم‌زمان (پیش‌فرض: 4)")
+    parser.add_argument("--rps", type=float, default=2.0,
+                        help="نرخ شروع درخواست در ثانیه برای هر میزبان، اگر نرخ یادگرفته‌شده‌ای نباشد (پیش‌فرض: 2؛ 0 یعنی بدون محدودیت)")
+    parser.add_argument("--max-rps", type=float, default=10.0, help="سقف نرخ تطبیقی درخواست در ثانیه (پیش‌فرض: 10)")
+    parser.add_argument("--rate-state", default="tgju_rate_state.json", help="فایل نرخ یادگرفته‌شده هر میزبان بین اجراها")
+    parser.add_argument("--source", choices=SOURCES, default="auto",
+                        help="منبع داده: فید JSON (json)، صفحات HTML (html) یا فید با جایگزین HTML (auto، پیش‌فرض)")
+    parser.add_argument("--parser", choices=sorted(PARSERS), default="strainer",
+                        help="backend تجزیه HTML: html.parser، strainer، lxml یا regex")
+    parser.add_argument("--store", default="tgju_prices.sqlite3", help="مسیر پایگاه داده محلی قیمت‌ها")
+    parser.add_argument("--no-store", action="store_true", help="بدون حافظه محلی؛ کل بازه از سایت دریافت شود")
+    parser.add_argument("--no-seek", action="store_true", help="بدون جستجوی دودویی صفحه شروع؛ پیمایش از صفحه ۱")
+    parser.add_argument("--no-verify", action="store_true",
+                        help="بدون بررسی یکپارچگی پس از استخراج (روزهای ناموجود و سطرهای نامعتبر یا تکراری متناقض)")
+    parser.add_argument("--cache-dir", default="tgju_http_cache", help="پوشه کش دیسکی صفحات دریافت‌شده")
+    parser.add_argument("--no-cache", action="store_true", help="بدون کش دیسکی صفحات")
+    parser.add_argument("--from-cache", action="store_true",
+                        help="بدون درخواست شبکه؛ خروجی فقط از صفحات کش دیسکی ساخته شود (تجزیه چندپردازه‌ای)")
+    parser.add_argument("--processes", type=int, help="تعداد پردازه‌های تجزیه در حالت --from-cache (پیش‌فرض: تعداد هسته‌ها)")
+    parser.add_argument("--indicators", action="store_true",
+                        help="افزودن میانگین متحرک، EMA، نوسان و افت از سقف و جدول‌های OHLC هفتگی و ماهانه شمسی")
+    parser.add_argument("--checkpoint-dir", default="tgju_checkpoints", help="پوشه نقاط بازیابی استخراج")
+    parser.add_argument("--metrics-jsonl", help="نوشتن رویدادهای زمان‌بندی و شمارنده‌ها به صورت JSON lines در این فایل")
+    parser.add_argument("--metrics-prom", help="نوشتن خلاصه اجرا در قالب متنی Prometheus در این فایل")
+    parser.add_argument("--profile-dir", help="ذخیره پروفایل cProfile هر اجرا در این پوشه")
+    parser.add_argument("-q", "--quiet", action="store_true", help="پیام‌های وضعیت چاپ نشوند")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    import jdatetime
+    from tgju_cache import ResponseCache
+    from tgju_checkpoint import CrawlCheckpoint
+    from tgju_fetcher import TGJUGoldFetcher
+    from tgju_metrics import JsonLinesExporter, Metrics, PrometheusExporter
+    from tgju_ratelimit import RateMemory
+    from tgju_store import PriceStore
+
+    def print_status(message):
+        print(message, file=sys.stderr, flush=True)
+
+    exporters = []
+    if args.metrics_jsonl:
+        exporters.append(JsonLinesExporter(args.metrics_jsonl))
+    if args.metrics_prom:
+        exporters.append(PrometheusExporter(args.metrics_prom))
+
+    fetcher = TGJUGoldFetcher(
+        None if args.quiet else print_status,
+        max_workers=max(1, args.workers),
+        requests_per_second=args.rps,
+        max_requests_per_second=args.max_rps,
+        rate_memory=RateMemory(args.rate_state),
+        parser=args.parser,
+        store=None if args.no_store else PriceStore(args.store),
+        checkpoint=CrawlCheckpoint(args.checkpoint_dir),
+        seek=not args.no_seek,
+        verify=not args.no_verify,
+        cache=None if args.no_cache else ResponseCache(args.cache_dir),
+        metrics=Metrics(exporters, profile_dir=args.profile_dir),
+        indicators=args.indicators,
+        source=args.source,
+    )
+    end = args.end or jdatetime.date.today().isoformat()
+    try:
+        if args.from_cache:
+            ok = fetcher.fetch_archive(args.urls, args.start, end, args.output, args.format, args.processes)
+        elif len(args.urls) > 1:
+            ok = fetcher.fetch_batch(args.urls, args.start, end, args.output, args.format)
+        else:
+            ok = fetcher.fetch_data(args.urls[0], args.start, end, args.output, args.format)
+    except KeyboardInterrupt:
+        fetcher.stop()
+        print_status("عملیات توسط کاربر متوقف شد.")
+        return 130
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
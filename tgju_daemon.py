@@ -0,0 +1,207 @@
+"""
+حالت سرویس: پایش دوره‌ای صفحه ۱ نمادها در طول روز و ثبت فقط سطرهای جدید یا تغییرکرده.
+
+نمونه:
+    python -m tgju_daemon https://english.tgju.org/profile/sekee --interval 300 --log changes.jsonl
+
+هزینه هر دور برای هر نماد یک درخواست صفحه ۱ است (با کش دیسکی، یک درخواست شرطی که اگر صفحه تغییر
+نکرده باشد 304 و بدون بدنه است)، نه استخراج کل بازه.
+"""
+import argparse
+import datetime as dt
+import json
+import sys
+import time
+from collections import namedtuple
+
+from tgju_indicators import IndicatorState
+from tgju_jobs import Cancelled
+from tgju_parsers import PARSERS
+from tgju_pipeline import parse_rows
+from tgju_store import PriceRow
+
+# kind: "new" برای تاریخی که قبلا دیده نشده و "changed" برای سطری که قیمتش تغییر کرده (مثلا روز جاری)
+# indicators: شاخص‌های تکنیکال همان روز ({نام ستون: مقدار}) اگر PriceWatcher با indicators=True ساخته شده باشد
+PriceChange = namedtuple("PriceChange", ["base_url", "kind", "row", "previous", "indicators"], defaults=(None,))
+
+
+# --- کلاس PriceWatcher: پایش صفحه ۱ نمادها با فاصله زمانی ثابت ---
+class PriceWatcher:
+    """
+    در هر دور صفحه ۱ هر نماد دریافت و با آخرین سطرهای دیده‌شده مقایسه می‌شود. سطرهای جدید یا تغییرکرده در
+    حافظه محلی (fetcher.store) ثبت، در صورت تنظیم log_path به صورت JSON lines اضافه و برای هر کدام
+    on_change(PriceChange) فراخوانی می‌شود. آخرین سطرهای دیده‌شده در شروع از حافظه محلی خوانده می‌شوند
+    تا راه‌اندازی دوباره سرویس رویدادهای تکراری تولید نکند.
+    با indicators=True شاخص‌های هر سطر تغییرکرده با یک tgju_indicators.IndicatorState برای هر نماد به صورت
+    افزایشی محاسبه می‌شوند؛ کل تاریخچه فقط در اولین دور (یا اصلاح سطرهای قدیمی‌تر) یک بار پیمایش می‌شود.
+    """
+
+    def __init__(self, fetcher, base_urls, interval=300, on_change=None, log_path=None, indicators=False):
+        self.fetcher = fetcher
+        self.base_urls = list(dict.fromkeys(base_urls))
+        self.interval = interval
+        self.on_change = on_change
+        self.log_path = log_path
+        # base_url -> {تاریخ میلادی: PriceRow}
+        self._last_seen = {}
+        self.indicators = indicators
+        # base_url -> IndicatorState
+        self._indicator_states = {}
+
+    def _page_rows(self, base_url):
+        url = f"{base_url}?p=1"
+        if not self.fetcher.transport.limiter_for(url).wait(self.fetcher.cancel_event): raise Cancelled()
+        html = self.fetcher.transport.get_text(url, revalidate=True)
+        return [PriceRow(dt.date.fromordinal(ordinal), high, low, (high + low) // 2)
+                for ordinal, high, low in parse_rows(html, self.fetcher.parser_name)]
+
+    def _known_rows(self, base_url, rows):
+        known = self._last_seen.get(base_url)
+        if known is None:
+            known = {}
+            if self.fetcher.store is not None and rows:
+                oldest = min(r.gregorian_date for r in rows)
+                newest = max(r.gregorian_date for r in rows)
+                known = {r.gregorian_date: r for r in self.fetcher.store.load(base_url, oldest, newest)}
+            self._last_seen[base_url] = known
+        return known
+
+    def poll_symbol(self, base_url):
+        """یک دور برای یک نماد؛ لیست PriceChangeها را برمی‌گرداند."""
+        rows = self._page_rows(base_url)
+        known = self._known_rows(base_url, rows)
+        changes = []
+        for row in rows:
+            previous = known.get(row.gregorian_date)
+            if previous is None:
+                changes.append(PriceChange(base_url, "new", row, None))
+            elif previous != row:
+                changes.append(PriceChange(base_url, "changed", row, previous))
+        if not changes: return changes
+        # رویدادها از قدیم به جدید
+        changes.sort(key=lambda c: c.row.gregorian_date)
+
+        # صفحه ۱ همه روزهای بین قدیمی‌ترین و جدیدترین سطرش را شامل می‌شود، پس این بازه پوشش‌داده‌شده است
+        if self.fetcher.store is not None:
+            self.fetcher.store.save(base_url, [c.row for c in changes], min(r.gregorian_date for r in rows),
+                                    max(r.gregorian_date for r in rows))
+        # فقط سطرهای همین صفحه نگه داشته می‌شوند تا حافظه در اجرای طولانی رشد نکند
+        self._last_seen[base_url] = {r.gregorian_date: r for r in rows}
+        if self.indicators:
+            values = self._indicator_values(base_url, changes)
+            changes = [c._replace(indicators=values[c.row.gregorian_date.toordinal()]) for c in changes]
+        self._emit(changes)
+        return changes
+
+    def _indicator_values(self, base_url, changes):
+        """{ordinal: شاخص‌ها} برای سطرهای تغییرکرده (مرتب از قدیم به جدید)."""
+        ordinals = [c.row.gregorian_date.toordinal() for c in changes]
+        state = self._indicator_states.get(base_url)
+        if state is not None and ordinals[0] >= state.last_ordinal:
+            # حالت عادی: روز جاری اصلاح یا روزهای جدید اضافه شده‌اند
+            return {o: state.update(o, c.row.high, c.row.low, c.row.average) for o, c in zip(ordinals, changes)}
+        if self.fetcher.store is not None:
+            history = self.fetcher.store.load(base_url, dt.date.min, dt.date.max)
+        else:
+            history = [c.row for c in changes]
+        state = IndicatorState()
+        wanted = set(ordinals)
+        values = {}
+        for gdate, high, low, average in history:
+            ordinal = gdate.toordinal()
+            result = state.update(ordinal, high, low, average)
+            if ordinal in wanted:
+                values[ordinal] = result
+        self._indicator_states[base_url] = state
+        return values
+
+    def _emit(self, changes):
+        if self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                for change in changes:
+                    f.write(json.dumps({
+                        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        "symbol": change.base_url,
+                        "kind": change.kind,
+                        "date": change.row.gregorian_date.isoformat(),
+                        "high": change.row.high,
+                        "low": change.row.low,
+                        "average": change.row.average,
+                        **({"indicators": change.indicators} if change.indicators is not None else {}),
+                    }, ensure_ascii=False) + "\n")
+        if self.on_change:
+            for change in changes:
+                self.on_change(change)
+
+    def poll_once(self):
+        """یک دور برای همه نمادها؛ خطای یک نماد دور بقیه را متوقف نمی‌کند."""
+        changes = []
+        for base_url in self.base_urls:
+            if self.fetcher.stop_flag: break
+            try:
+                changes.extend(self.poll_symbol(base_url))
+            except Cancelled:
+                break
+            except Exception as e:
+                self.fetcher._update_status(f"خطا در پایش {base_url}: {e}")
+        return changes
+
+    def run(self, max_polls=None):
+        """تا فراخوانی stop() (یا max_polls دور) هر interval ثانیه یک دور اجرا می‌شود."""
+        self.fetcher._begin_run()
+        polls = 0
+        while not self.fetcher.stop_flag:
+            started = time.monotonic()
+            changes = self.poll_once()
+            polls += 1
+            self.fetcher._update_status(f"دور {polls}: {len(changes)} سطر جدید یا تغییرکرده.")
+            if max_polls is not None and polls >= max_polls: break
+            # فاصله بین شروع دورها ثابت است؛ انتظار با stop() فوراً قطع می‌شود
+            if self.fetcher.cancel_event.wait(max(0.0, self.interval - (time.monotonic() - started))): break
+        self.fetcher.transport.save_rates()
+
+    def stop(self):
+        self.fetcher.stop()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m tgju_daemon", description="پایش دوره‌ای قیمت‌های TGJU")
+    parser.add_argument("urls", nargs="+", help="آدرس صفحه نمادها")
+    parser.add_argument("--interval", type=float, default=300, help="فاصله دورهای پایش بر حسب ثانیه (پیش‌فرض: 300)")
+    parser.add_argument("--store", default="tgju_prices.sqlite3", help="مسیر پایگاه داده محلی قیمت‌ها")
+    parser.add_argument("--cache-dir", default="tgju_http_cache", help="پوشه کش دیسکی صفحات (برای درخواست شرطی)")
+    parser.add_argument("--log", help="افزودن رویدادهای تغییر قیمت به صورت JSON lines به این فایل")
+    parser.add_argument("--parser", choices=sorted(PARSERS), default="regex", help="backend تجزیه HTML (پیش‌فرض: regex)")
+    parser.add_argument("--indicators", action="store_true", help="محاسبه افزایشی شاخص‌های تکنیکال هر سطر تغییرکرده")
+    parser.add_argument("-q", "--quiet", action="store_true", help="پیام‌های وضعیت چاپ نشوند")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from tgju_cache import ResponseCache
+    from tgju_fetcher import TGJUGoldFetcher
+    from tgju_ratelimit import RateMemory
+    from tgju_store import PriceStore
+
+    def print_status(message):
+        print(message, file=sys.stderr, flush=True)
+
+    def print_change(change):
+        row = change.row
+        print(f"{change.kind}\t{change.base_url}\t{row.gregorian_date}\t{row.high}\t{row.low}\t{row.average}", flush=True)
+
+    fetcher = TGJUGoldFetcher(None if args.quiet else print_status, parser=args.parser, store=PriceStore(args.store),
+                              cache=ResponseCache(args.cache_dir), rate_memory=RateMemory())
+    watcher = PriceWatcher(fetcher, args.urls, args.interval, on_change=print_change, log_path=args.log,
+                           indicators=args.indicators)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
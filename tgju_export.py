@@ -0,0 +1,102 @@
+import importlib.util
+import os
+
+from tgju_jobs import Cancelled
+
+# --- نوشتن جدول خروجی در فایل ---
+# pandas در این ماژول import نمی‌شود؛ ورودی‌ها DataFrame هستند و خود pandas را همراه دارند.
+
+FORMATS = ("xlsx", "csv", "parquet", "feather", "jsonl")
+EXTENSIONS = {
+    ".xlsx": "xlsx",
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+
+def detect_format(output_filepath, output_format=None):
+    """قالب خروجی از پارامتر صریح یا پسوند فایل تعیین می‌شود؛ پیش‌فرض اکسل است."""
+    if output_format:
+        output_format = output_format.lower().lstrip(".")
+    else:
+        output_format = EXTENSIONS.get(os.path.splitext(output_filepath)[1].lower(), "xlsx")
+    if output_format not in FORMATS:
+        raise ValueError(f"قالب خروجی ناشناخته: {output_format}. گزینه‌های مجاز: {', '.join(FORMATS)}")
+    return output_format
+
+
+def _require(module, output_format):
+    if importlib.util.find_spec(module) is None:
+        raise ValueError(f"برای خروجی {output_format} باید بسته {module} نصب شود.")
+
+
+def _check_cancelled(cancelled):
+    if cancelled is not None and cancelled.is_set():
+        raise Cancelled()
+
+
+def write_xlsx(sheets, output_filepath, cancelled=None):
+    """
+    {نام شیت: DataFrame} را در یک فایل اکسل می‌نویسد. اگر xlsxwriter نصب باشد در حالت constant_memory
+    و سطر به سطر نوشته می‌شود (هر سطر بلافاصله روی دیسک می‌رود)؛ در غیر این صورت openpyxl از طریق pandas.
+    با فعال شدن رویداد cancelled نوشتن قطع و فایل نیمه‌کاره حذف می‌شود.
+    """
+    _check_cancelled(cancelled)
+    if importlib.util.find_spec("xlsxwriter") is None:
+        import pandas as pd
+        with pd.ExcelWriter(output_filepath) as writer:
+            for name, df in sheets.items():
+                df.to_excel(writer, sheet_name=name, index=False)
+        return
+
+    import xlsxwriter
+    # DataFrame.to_excel سلول‌ها را ستون به ستون می‌نویسد که با constant_memory سازگار نیست
+    workbook = xlsxwriter.Workbook(output_filepath, {"constant_memory": True})
+    try:
+        header_format = workbook.add_format({"bold": True, "border": 1, "align": "center"})
+        for name, df in sheets.items():
+            worksheet = workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, [str(c) for c in df.columns], header_format)
+            # tolist مقادیر numpy را به int/str پایتون تبدیل می‌کند؛ NaN (مثلا شاخص‌ها پیش از پر شدن پنجره) سلول خالی است
+            columns = [[None if v != v else v for v in df[c].tolist()] if df[c].dtype.kind == "f" else df[c].tolist()
+                       for c in df.columns]
+            for i, row in enumerate(zip(*columns), start=1):
+                if i % 2048 == 0: _check_cancelled(cancelled)
+                worksheet.write_row(i, 0, row)
+    except Cancelled:
+        workbook.close()
+        os.remove(output_filepath)
+        raise
+    else:
+        workbook.close()
+
+
+def write_frame(df, output_filepath, output_format=None, cancelled=None, extra=None):
+    """
+    extra: {نام: DataFrame} جدول‌های جانبی (مثلا OHLC هفتگی)؛ در اکسل شیت‌های بعدی همان فایل و در بقیه قالب‌ها
+    فایل‌های کنار خروجی با پسوند _نام.
+    """
+    output_format = detect_format(output_filepath, output_format)
+    _check_cancelled(cancelled)
+    if extra and output_format != "xlsx":
+        stem, ext = os.path.splitext(output_filepath)
+        for name, extra_df in extra.items():
+            write_frame(extra_df, f"{stem}_{name}{ext}", output_format, cancelled)
+    if output_format == "xlsx":
+        write_xlsx({"Sheet1": df, **(extra or {})}, output_filepath, cancelled)
+    elif output_format == "csv":
+        # utf-8-sig تا اکسل متن فارسی را درست نمایش دهد
+        df.to_csv(output_filepath, index=False, encoding="utf-8-sig")
+    elif output_format == "parquet":
+        _require("pyarrow", output_format)
+        df.to_parquet(output_filepath, index=False)
+    elif output_format == "feather":
+        _require("pyarrow", output_format)
+        df.reset_index(drop=True).to_feather(output_filepath)
+    elif output_format == "jsonl":
+        df.to_json(output_filepath, orient="records", lines=True, force_ascii=False)
@@ -0,0 +1,683 @@
+import datetime as dt
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import jdatetime
+import requests
+
+from tgju_batch import crawl_batch, symbol_name, write_batch_output
+from tgju_export import write_frame
+from tgju_integrity import PageLog, TradingCalendar, check_rows
+from tgju_jobs import CancelEvent, Cancelled
+from tgju_metrics import Metrics
+from tgju_parsers import get_parser
+from tgju_sources import get_source
+from tgju_store import PriceRow, RowBuffer, merge_ranges
+from tgju_transport import TGJUTransport
+
+# این ماژول عمداً tkinter، pandas و bs4 را در سطح ماژول import نمی‌کند تا در حالت بدون رابط
+# گرافیکی (tgju_cli) شروع برنامه سریع باشد؛ pandas فقط هنگام ساخت خروجی بارگذاری می‌شود.
+
+
+def _to_gregorian(value):
+    if isinstance(value, str):
+        return jdatetime.date.fromisoformat(value).togregorian()
+    if isinstance(value, jdatetime.date):
+        return value.togregorian()
+    return value
+
+# --- کلاس TGJUGoldFetcher: منطق استخراج داده ---
+class TGJUGoldFetcher:
+    HEADERS = TGJUTransport.HEADERS
+
+    def __init__(self, status_callback=None, max_workers=1, requests_per_second=2.0, parser="strainer", store=None,
+                 checkpoint=None, seek=False, cache=None, metrics=None, rate_memory=None, max_requests_per_second=10.0,
+                 progress_callback=None, indicators=False, source="html", verify=False, result_callback=None):
+        self.status_callback = status_callback
+        # progress_callback(صفحات پردازش‌شده، تخمین کل صفحات یا None)
+        self.progress_callback = progress_callback
+        # result_callback({base_url: DataFrame خروجی}) پس از نوشتن موفق خروجی (مثلا برای نمودار رابط کاربری)
+        self.result_callback = result_callback
+        # رویداد لغو اجرای جاری (_begin_run)؛ stop() آن را فعال می‌کند و انتظار برای نوبت درخواست، تأخیر تلاش
+        # مجدد و درخواست در حال انتظار بلافاصله قطع می‌شوند (tgju_jobs.Cancelled)
+        self.cancel_event = CancelEvent()
+        # حافظه محلی قیمت‌ها (tgju_store.PriceStore)؛ None یعنی هر بار کل بازه از سایت دریافت شود
+        self.store = store
+        # نقطه بازیابی استخراج (tgju_checkpoint.CrawlCheckpoint)؛ None یعنی بدون ادامه پس از قطع
+        self.checkpoint = checkpoint
+        self._newest_seen_date = None
+        # جستجوی دودویی صفحه شروع به جای پیمایش همه صفحات جدیدتر از تاریخ پایان
+        self.seek = seek
+        self._prefetched = {}
+        # در دریافت دوباره (_refetch) صفحات بدون کش دیسکی گرفته می‌شوند؛ نسخه کش‌شده همان صفحه ناقص است
+        self._refresh = False
+        # تعداد صفحاتی که هم‌زمان در حال دریافت هستند (۱ یعنی حالت ترتیبی قبلی)
+        self.max_workers = max_workers
+        # زمان‌بندی مراحل و شمارنده‌ها (tgju_metrics.Metrics)؛ exporterها تعیین می‌کنند کجا نوشته شوند
+        self.metrics = metrics if metrics is not None else Metrics()
+        # requests_per_second نرخ شروع است و با پاسخ‌های سرور تنظیم می‌شود (tgju_ratelimit)؛ rate_memory
+        # (tgju_ratelimit.RateMemory) نرخ یادگرفته‌شده را بین اجراها نگه می‌دارد. 0 یعنی بدون محدودیت.
+        self.transport = TGJUTransport(retry_callback=self._on_retry, cache=cache, metrics=self.metrics,
+                                       requests_per_second=requests_per_second,
+                                       max_requests_per_second=max_requests_per_second, rate_memory=rate_memory,
+                                       cancel_event=self.cancel_event)
+        # backend تجزیه HTML؛ "html.parser" مسیر قدیمی ساخت کامل DOM است (tgju_parsers.PARSERS)
+        self.parser = get_parser(parser)
+        self.parser_name = parser
+        # منبع سطرها (tgju_sources)؛ "html" صفحات ?p=N، "json" فید جدولی و "auto" فید با جایگزین HTML
+        self.source = get_source(source)
+        # ستون‌های شاخص تکنیکال در خروجی و برای یک نماد جدول‌های OHLC هفتگی و ماهانه (tgju_indicators)
+        self.indicators = indicators
+        # بررسی یکپارچگی پس از استخراج و دریافت دوباره فقط صفحات/بازه‌های ناقص (tgju_integrity)
+        self.verify = verify
+        # خلاصه صفحات استخراج در جریان (tgju_integrity.PageLog) که _process_rows پر می‌کند
+        self._page_log = None
+
+    def _update_status(self, message):
+        if self.status_callback:
+            self.status_callback(message)
+
+    @staticmethod
+    def _estimate_pages(pages_done, pages_before_range, rows, start_gregorian_date, end_gregorian_date):
+        """
+        تخمین کل صفحات یک استخراج: سطرها از جدید به قدیم‌اند، پس قدیمی‌ترین تاریخ دیده‌شده نشان می‌دهد چه سهمی
+        از بازه با صفحاتی که سطر داخل بازه داشته‌اند پوشش داده شده است. None یعنی هنوز سطری در بازه دیده نشده.
+        """
+        if not rows: return None
+        covered = ((end_gregorian_date - rows[-1][0]).days + 1) / ((end_gregorian_date - start_gregorian_date).days + 1)
+        in_range_pages = pages_done - pages_before_range
+        return max(pages_done + 1, pages_before_range + round(in_range_pages / min(1.0, covered)))
+
+    def _report_progress(self, pages_done, total):
+        if self.progress_callback:
+            self.progress_callback(pages_done, total)
+
+    def _report_result(self, frames):
+        if self.result_callback:
+            self.result_callback(frames)
+
+    def _on_retry(self, url, attempt, reason, delay):
+        self._update_status(f"هشدار: خطای گذرا ({reason}) در {url}. تلاش مجدد {attempt} پس از {delay:.1f} ثانیه...")
+
+    @property
+    def stop_flag(self):
+        return self.cancel_event.is_set()
+
+    def stop(self):
+        self.cancel_event.set()
+
+    def _begin_run(self, cancel_event=None):
+        """
+        شروع یک اجرا با رویداد لغو خودش به جای پاک کردن یک پرچم مشترک: کاری که از صف اجرا می‌شود
+        Job.cancel_event را می‌دهد تا توقفی که پیش از شروع استخراج برسد از دست نرود.
+        """
+        self.cancel_event = cancel_event if cancel_event is not None else CancelEvent()
+        self.transport.cancel_event = self.cancel_event
+        self.source.reset()
+
+    def _download_page(self, base_url, page, cancelled=None):
+        """HTML صفحه؛ None اگر رویداد cancelled هنگام انتظار برای نوبت درخواست فعال شود."""
+        # صفحاتی که هنگام جستجوی صفحه شروع دریافت شده‌اند دوباره درخواست نمی‌شوند
+        html = self._prefetched.pop((base_url, page), None)
+        if html is not None: return html
+        url = f"{base_url}?p={page}"
+        if not self.transport.limiter_for(url).wait(cancelled or self.cancel_event): return None
+        self._update_status(f"در حال دریافت صفحه {page}...")
+        try:
+            with self.metrics.span("download", page=page):
+                return self.transport.get_text(url, refresh=self._refresh)
+        except requests.exceptions.RequestException as e:
+            raise IOError(f"خطا در ارتباط شبکه: {e}. لطفا اتصال اینترنت و آدرس URL را بررسی کنید.")
+
+    def _process_page(self, html, page, start_gregorian_date, end_gregorian_date):
+        """سطرهای بازه در یک صفحه را برمی‌گرداند؛ done=True یعنی صفحات بعدی لازم نیستند."""
+        with self.metrics.span("parse", page=page):
+            parsed = list(self.parser(html))
+        return self._process_rows(parsed, page, start_gregorian_date, end_gregorian_date)
+
+    def _process_rows(self, parsed, page, start_gregorian_date, end_gregorian_date):
+        """سطرهای (تاریخ، حداکثر، حداقل) رشته‌ای یک صفحه از هر منبع -> (PriceRowهای بازه، done)."""
+        page_rows = []
+        page_processed_any_data_row = False
+        reached_start_date_in_history = False
+        count = 0
+        newest = gdate = None
+        invalid = []
+        t0 = time.perf_counter()
+        for date_str, high_str, low_str in parsed:
+            if self.stop_flag: break
+            page_processed_any_data_row = True
+            gdate = dt.date.fromisoformat(date_str)
+            count += 1
+            if newest is None: newest = gdate
+            if page == 1 and self._newest_seen_date is None: self._newest_seen_date = gdate
+            if gdate < start_gregorian_date:
+                reached_start_date_in_history = True
+                break
+            if gdate > end_gregorian_date: continue
+            try:
+                high = int(high_str)
+                low = int(low_str)
+                avg = (high + low) // 2
+                page_rows.append(PriceRow(gdate, high, low, avg))
+            except ValueError:
+                self._update_status(f"هشدار: داده نامعتبر در تاریخ {gdate}. نادیده گرفته شد.")
+                self.metrics.count("invalid_rows")
+                invalid.append(gdate)
+                continue
+        if self._page_log is not None:
+            self._page_log.record(page, count, newest, gdate, invalid, end_gregorian_date)
+        self.metrics.observe("rows", time.perf_counter() - t0, page=page, rows=len(page_rows))
+        self.metrics.count("pages")
+        self.metrics.count("rows", len(page_rows))
+        done = reached_start_date_in_history or (not page_processed_any_data_row and page > 1)
+        return page_rows, done
+
+    def _iter_pages_sequentially(self, base_url, start_gregorian_date, end_gregorian_date, first_page):
+        page = first_page
+        while not self.stop_flag:
+            html = self._download_page(base_url, page)
+            if self.stop_flag: break
+            page_rows, done = self._process_page(html, page, start_gregorian_date, end_gregorian_date)
+            if self.stop_flag: break
+            yield page, page_rows
+            if done: break
+            page += 1
+
+    def _iter_pages_concurrently(self, base_url, start_gregorian_date, end_gregorian_date, first_page):
+        # پنجره‌ای از صفحات جلوتر دریافت می‌شود ولی پردازش به ترتیب شماره صفحه انجام می‌شود
+        # تا خروجی دقیقاً مانند حالت ترتیبی باشد.
+        cancelled = self.cancel_event.child()
+
+        def download(page):
+            if self.stop_flag: return None
+            return self._download_page(base_url, page, cancelled)
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = deque()
+        next_page = first_page
+        # اندازه پنجره از ۱ شروع و دو برابر می‌شود تا درخواست‌های کوتاه (مثلا به‌روزرسانی روزانه) فقط صفحه اول را بگیرند
+        window = 1
+        try:
+            while not self.stop_flag:
+                while len(pending) < window:
+                    pending.append((next_page, pool.submit(download, next_page)))
+                    next_page += 1
+                page, future = pending.popleft()
+                html = future.result()
+                if html is None: break
+                page_rows, done = self._process_page(html, page, start_gregorian_date, end_gregorian_date)
+                if self.stop_flag: break
+                yield page, page_rows
+                if done: break
+                window = min(self.max_workers, window * 2)
+        finally:
+            # صفحات باقی‌مانده پنجره دیگر لازم نیستند
+            cancelled.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _probe_page(self, base_url, page):
+        """(جدیدترین تاریخ، قدیمی‌ترین تاریخ، تعداد سطر) یک صفحه؛ None برای صفحه بدون سطر داده."""
+        html = self._download_page(base_url, page)
+        if html is None: return None
+        self._prefetched[(base_url, page)] = html
+        dates = [date_str for date_str, _, _ in self.parser(html)]
+        if not dates: return None
+        return dt.date.fromisoformat(dates[0]), dt.date.fromisoformat(dates[-1]), len(dates)
+
+    def _seek_first_page(self, base_url, end_gregorian_date):
+        """
+        اولین صفحه‌ای که سطری با تاریخ <= end_gregorian_date دارد را پیدا می‌کند.
+        صفحات از جدید به قدیم مرتب‌اند، پس با تخمین از روی تراکم سطرها (سطر در روز، که از صفحات دیده‌شده
+        یاد گرفته می‌شود) و سپس جستجوی نمایی/دودویی با O(log N) درخواست به صفحه شروع می‌رسیم.
+        """
+        first = self._probe_page(base_url, 1)
+        if first is None: return 1
+        newest, oldest, rows_per_page = first
+        self._newest_seen_date = newest
+        if oldest <= end_gregorian_date: return 1
+
+        # lo: آخرین صفحه‌ای که همه سطرهایش جدیدتر از end است؛ hi: اولین صفحه‌ای که شرط را دارد
+        lo, lo_oldest, hi = 1, oldest, None
+        probes = 1
+        step = 1
+        estimate_used_in_bisect = False
+        while hi is None or hi - lo > 1:
+            if self.stop_flag: return lo + 1
+            rows_per_day = rows_per_page * lo / ((newest - lo_oldest).days + 1)
+            estimate = lo + max(1, -(-int((lo_oldest - end_gregorian_date).days * rows_per_day) // rows_per_page))
+            if hi is None:
+                # مرحله نمایی: تخمین، ولی در صورت خطاهای پیاپی با گام دوبرابرشونده جلو می‌رویم
+                page = max(estimate, lo + step)
+                step *= 2
+            elif not estimate_used_in_bisect:
+                # مرحله دودویی: اولین بار تخمین (محدود به بازه)، بعد از آن وسط بازه
+                page = min(max(estimate, lo + 1), hi - 1)
+                estimate_used_in_bisect = True
+            else:
+                page = (lo + hi) // 2
+            bounds = self._probe_page(base_url, page)
+            probes += 1
+            if bounds is None or bounds[1] <= end_gregorian_date:
+                hi = page
+            else:
+                lo, lo_oldest = page, bounds[1]
+        self._update_status(f"صفحه شروع بازه ({hi}) با {probes} درخواست پیدا شد.")
+        return hi
+
+    def _iter_pages(self, base_url, start_gregorian_date, end_gregorian_date, first_page=1):
+        """(شماره صفحه، سطرهای بازه) را برای هر صفحه کامل‌شده به ترتیب صفحات از منبع داده تولید می‌کند."""
+        return self.source.iter_pages(self, base_url, start_gregorian_date, end_gregorian_date, first_page)
+
+    def _iter_html_pages(self, base_url, start_gregorian_date, end_gregorian_date, first_page=1):
+        self._prefetched = {}
+        if first_page == 1 and self.seek:
+            first_page = self._seek_first_page(base_url, end_gregorian_date)
+        if self.max_workers > 1:
+            return self._iter_pages_concurrently(base_url, start_gregorian_date, end_gregorian_date, first_page)
+        return self._iter_pages_sequentially(base_url, start_gregorian_date, end_gregorian_date, first_page)
+
+    def iter_rows(self, base_url, start_date, end_date):
+        """
+        سطرهای بازه را صفحه به صفحه و به محض دریافت تولید می‌کند (از جدید به قدیم).
+        start_date و end_date می‌توانند رشته شمسی YYYY-MM-DD، jdatetime.date یا datetime.date باشند.
+        خروجی PriceRow است؛ اگر در حین استخراج صفحات سایت جابه‌جا شوند ممکن است تاریخی تکراری باشد.
+        بستن generator یا فراخوانی stop() دریافت صفحات باقی‌مانده را لغو می‌کند.
+        """
+        self._begin_run()
+        self._newest_seen_date = None
+        start_gregorian_date = _to_gregorian(start_date)
+        end_gregorian_date = _to_gregorian(end_date)
+        if start_gregorian_date > end_gregorian_date:
+            raise ValueError("تاریخ شروع باید قبل از یا برابر با تاریخ پایان باشد.")
+        for _, page_rows in self._iter_pages(base_url, start_gregorian_date, end_gregorian_date):
+            yield from page_rows
+
+    def _fetch_pages(self, base_url, start_gregorian_date, end_gregorian_date, all_data):
+        """سطرهای بازه را به all_data اضافه می‌کند و PageLog صفحات دریافت‌شده را برمی‌گرداند."""
+        first_page = 1
+        crawl_end = end_gregorian_date
+        # تاریخ پایانی که نقطه بازیابی برای آن ذخیره می‌شود؛ تا وقتی روزهای بعد از پایان نقطه بازیابی قبلی
+        # (newer) دریافت نشده‌اند، همان پایان قبلی می‌ماند
+        checkpoint_end = end_gregorian_date
+        newer = None
+        self._newest_seen_date = None
+        if self.checkpoint is not None:
+            state = self.checkpoint.load(base_url, start_gregorian_date, end_gregorian_date)
+            if state:
+                all_data.extend(state["rows"])
+                checkpoint_end = crawl_end = state["end_date"]
+                if crawl_end < end_gregorian_date:
+                    # نقطه بازیابی یک اجرای قبلی با پایان زودتر (مثلا «امروز» دیروز): روزهای جدیدتر جدا دریافت
+                    # می‌شوند و جدیدترین تاریخ منتشرشده از صفحه اول همین اجرا خوانده می‌شود
+                    newer = (crawl_end + dt.timedelta(days=1), end_gregorian_date)
+                else:
+                    self._newest_seen_date = state["newest_seen_date"]
+                if state["source"] == self.source.name and not self.source.date_bounded:
+                    first_page = state["last_page"] + 1
+                    self._update_status(f"ادامه استخراج قبلی از صفحه {first_page} ({len(state['rows'])} سطر بازیابی شد)...")
+                elif state["rows"]:
+                    # شماره صفحه فقط در همان منبع صفحه‌ای معنا دارد؛ در بقیه حالت‌ها از روز قبل از قدیمی‌ترین سطر ادامه می‌یابد
+                    crawl_end = min(r.gregorian_date for r in state["rows"]) - dt.timedelta(days=1)
+                    self._update_status(f"ادامه استخراج قبلی تا تاریخ {crawl_end} ({len(state['rows'])} سطر بازیابی شد)...")
+        last_good_page = first_page - 1
+        pages_done = 0
+        # صفحات جدیدتر از تاریخ پایان (وقتی جستجوی صفحه شروع غیرفعال است) در تخمین پیشرفت جدا شمرده می‌شوند
+        pages_before_range = 0
+
+        def crawls():
+            # (ادامه استخراج قبلی؟، شماره صفحه، سطرها): اول روزهای جدیدتر، بعد ادامه از صفحه بعد از نقطه بازیابی
+            if newer is not None:
+                for page, page_rows in self._iter_pages(base_url, newer[0], newer[1]):
+                    yield False, page, page_rows
+                if self.stop_flag: return
+            for page, page_rows in self._iter_pages(base_url, start_gregorian_date, crawl_end, first_page):
+                yield True, page, page_rows
+
+        completed = False
+        page_log = self._page_log = PageLog()
+        try:
+            for resumed, page, page_rows in crawls():
+                all_data.extend(page_rows)
+                if resumed:
+                    last_good_page = page
+                    checkpoint_end = end_gregorian_date
+                pages_done += 1
+                if not all_data:
+                    pages_before_range = pages_done
+                self._report_progress(pages_done, self._estimate_pages(pages_done, pages_before_range, all_data,
+                                                                       start_gregorian_date, end_gregorian_date))
+                if self.checkpoint is not None and resumed and page % self.checkpoint.every_pages == 0:
+                    self.checkpoint.save(base_url, start_gregorian_date, checkpoint_end, page, all_data,
+                                         self._newest_seen_date, self.source.name)
+            completed = not self.stop_flag
+            if completed:
+                page_log.finish()
+                self._report_progress(pages_done, pages_done)
+        finally:
+            self._page_log = None
+            # در صورت خطا یا توقف کاربر، وضعیت تا آخرین صفحه سالم ذخیره می‌شود
+            if self.checkpoint is not None:
+                if completed:
+                    self.checkpoint.clear(base_url, start_gregorian_date)
+                elif last_good_page > 0:
+                    self.checkpoint.save(base_url, start_gregorian_date, checkpoint_end, last_good_page, all_data,
+                                         self._newest_seen_date, self.source.name)
+        return page_log
+
+    def _refetch(self, base_url, start_gregorian_date, end_gregorian_date, pages, windows):
+        """
+        سطرهای صفحات pages (فقط منبع صفحه‌ای HTML) و بازه‌های تاریخ windows را دوباره دریافت می‌کند؛ همه
+        درخواست‌ها از شبکه‌اند و نسخه کش دیسکی جایگزین می‌شود. (سطرها، PageInfo صفحات pages) برگردانده می‌شود.
+        """
+        rows = RowBuffer()
+        page_log = self._page_log = PageLog()
+        # هر بازه با جستجوی صفحه شروع (یا در منابع با بازه تاریخ، یک درخواست محدود به همان بازه) دریافت می‌شود
+        seek, self.seek = self.seek, True
+        self._refresh = True
+        self._prefetched = {}
+        try:
+            for page in pages:
+                if self.stop_flag: break
+                html = self._download_page(base_url, page)
+                if html is None: break
+                rows.extend(self._process_page(html, page, start_gregorian_date, end_gregorian_date)[0])
+            self._page_log = None
+            for window_start, window_end in windows:
+                if self.stop_flag: break
+                for _, page_rows in self._iter_pages(base_url, window_start, window_end):
+                    rows.extend(page_rows)
+        finally:
+            self.seek = seek
+            self._refresh = False
+            self._page_log = None
+        return rows, page_log.pages
+
+    def _verify(self, base_url, start_gregorian_date, end_gregorian_date, all_data, page_log=None):
+        """
+        بررسی یکپارچگی سطرهای یک استخراج (tgju_integrity.check_rows) و دریافت دوباره فقط صفحات یا بازه‌هایی
+        که سطر ناموجود، نامعتبر یا متناقض دارند. (RowBuffer سطرهای دوباره دریافت‌شده که باید جایگزین سطرهای
+        قبلی همان تاریخ‌ها شوند، روزهایی که پس از دریافت دوباره هنوز سطری ندارند) را برمی‌گرداند.
+        """
+        repaired = RowBuffer()
+        # روزهای بعد از جدیدترین سطر هنوز منتشر نشده‌اند
+        newest = [self._newest_seen_date] if self._newest_seen_date else []
+        if all_data:
+            newest.append(dt.date.fromordinal(max(all_data.ordinals)))
+        if not newest: return repaired, []
+        newest = max(newest)
+        calendar = TradingCalendar()
+        with self.metrics.span("verify", rows=len(all_data)):
+            report = check_rows(all_data, start_gregorian_date, end_gregorian_date, calendar, page_log, newest)
+        if report.ok: return repaired, []
+
+        windows = report.windows
+        pages = report.pages
+        if self.source.date_bounded:
+            # شماره صفحه منابع با بازه تاریخ پایدار نیست؛ صفحه با بازه تاریخ سطرهایش دوباره دریافت می‌شود
+            windows = merge_ranges(windows + report.page_spans)
+            pages = []
+        self._update_status(f"بررسی یکپارچگی: {report.summary()}؛ دریافت دوباره {len(pages)} صفحه و "
+                            f"{len(windows)} بازه تاریخ...")
+        with self.metrics.span("repair", pages=len(pages), windows=len(windows)):
+            repaired, refetched = self._refetch(base_url, start_gregorian_date, end_gregorian_date, pages, windows)
+        if self.stop_flag: return repaired, report.missing
+        merged = RowBuffer(repaired)
+        merged.extend(all_data)
+        # روزهای بدون سطر در صفحات سالم دوباره دریافت‌شده در سایت وجود ندارند (مثلا تعطیلات قمری)؛ بقیه تأیید نشده‌اند
+        after_log = page_log.replaced(refetched) if page_log is not None else None
+        after = check_rows(merged, start_gregorian_date, end_gregorian_date, calendar, after_log, newest)
+        self.metrics.count("repaired_rows", len(repaired))
+        if after.missing and after_log is not None and self.transport.cache is not None and not self.source.date_bounded:
+            # صفحات کش‌شده‌ای که روزهای تأییدنشده در آن‌ها هستند حذف می‌شوند تا اجرای بعد از شبکه بگیرد
+            for i in {i for day in after.missing for i in after_log.locate(day)}:
+                self.transport.cache.discard(f"{base_url}?p={after_log.pages[i].page}")
+        self._update_status(f"بررسی یکپارچگی: {len(repaired)} سطر دوباره دریافت شد؛ "
+                            f"{len(set(after.closed) - set(report.closed))} روز در سایت هم سطری ندارد و "
+                            f"{len(after.missing)} روز هنوز سطری ندارد.")
+        return repaired, after.missing
+
+    def _fetch_with_store(self, base_url, start_gregorian_date, end_gregorian_date):
+        # فقط بخش‌هایی از بازه که در حافظه محلی پوشش داده نشده‌اند از سایت دریافت می‌شوند؛ هر بخش جدا استخراج،
+        # بررسی و ذخیره می‌شود تا بازه ذخیره‌شده بین دو بخش دوباره دریافت نشود
+        missing = self.store.missing_ranges(base_url, start_gregorian_date, end_gregorian_date)
+        if not missing:
+            self._update_status("کل بازه در حافظه محلی موجود است؛ نیازی به دریافت از سایت نیست.")
+            return self.store.load(base_url, start_gregorian_date, end_gregorian_date)
+        # بخش‌های قدیمی‌تر با جستجوی صفحه شروع دریافت می‌شوند نه با پیمایش صفحات جدیدتر از خودشان
+        seek, self.seek = self.seek, self.seek or len(missing) > 1
+        newest_seen = None
+        try:
+            # از جدید به قدیم، تا جدیدترین تاریخ منتشرشده از صفحه اول در بخش اول دیده شود
+            for crawl_start, crawl_end in reversed(missing):
+                crawled = RowBuffer()
+                page_log = self._fetch_pages(base_url, crawl_start, crawl_end, crawled)
+                if self.stop_flag: return []
+                newest_seen = max(filter(None, (newest_seen, self._newest_seen_date)), default=None)
+                self._newest_seen_date = newest_seen
+                unresolved = []
+                if self.verify and crawled:
+                    # فقط سطرهای همین بخش بررسی می‌شوند؛ روزهای بدون سطر بازه‌های پوشش‌داده‌شده قبلی تعطیل‌اند.
+                    # در ذخیره، سطر بعدی همان تاریخ جایگزین قبلی می‌شود، پس سطرهای دوباره دریافت‌شده آخر می‌آیند
+                    repaired, unresolved = self._verify(base_url, crawl_start, crawl_end, crawled, page_log)
+                    crawled.extend(repaired)
+                    if self.stop_flag: return []
+                # روزهای بعد از جدیدترین سطر صفحه اول هنوز منتشر نشده‌اند و خود آن روز (معمولا امروز) در طول روز
+                # تغییر می‌کند (tgju_daemon.PriceChange)؛ هیچ‌کدام پوشش‌داده‌شده ثبت نمی‌شوند تا اجرای بعد دوباره بگیرد
+                if newest_seen is None:
+                    covered_end = crawl_start - dt.timedelta(days=1)
+                else:
+                    covered_end = min(crawl_end, newest_seen - dt.timedelta(days=1))
+                # روزهایی که پس از دریافت دوباره هم سطری ندارند پوشش‌داده‌شده ثبت نمی‌شوند تا اجرای بعد دوباره امتحان شوند
+                self.store.save(base_url, crawled, crawl_start, covered_end, gaps=unresolved)
+        finally:
+            self.seek = seek
+        return self.store.load(base_url, start_gregorian_date, end_gregorian_date)
+
+    def fetch_data(self, base_url, start_jalali_str, end_jalali_str, output_filepath, output_format=None,
+                   cancel_event=None):
+        """cancel_event رویداد لغو همین اجرا است (مثلا Job.cancel_event)؛ None یعنی رویداد جدید که stop() فعالش می‌کند."""
+        with self.metrics.run("fetch_data", url=base_url, start=start_jalali_str, end=end_jalali_str):
+            try:
+                return self._fetch_data(base_url, start_jalali_str, end_jalali_str, output_filepath, output_format,
+                                        cancel_event)
+            finally:
+                self.transport.save_rates()
+
+    def _fetch_data(self, base_url, start_jalali_str, end_jalali_str, output_filepath, output_format, cancel_event):
+        self._begin_run(cancel_event)
+        try:
+            start_jalali_date = jdatetime.date.fromisoformat(start_jalali_str)
+            end_jalali_date = jdatetime.date.fromisoformat(end_jalali_str)
+
+            if start_jalali_date > end_jalali_date:
+                raise ValueError("تاریخ شروع باید قبل از یا برابر با تاریخ پایان باشد.")
+
+            start_gregorian_date = start_jalali_date.togregorian()
+            end_gregorian_date = end_jalali_date.togregorian()
+            self._update_status(f"در حال جمع‌آوری داده‌ها از {start_jalali_str} تا {end_jalali_str}...")
+            if self.store is not None:
+                all_data = self._fetch_with_store(base_url, start_gregorian_date, end_gregorian_date)
+            else:
+                all_data = RowBuffer()
+                page_log = self._fetch_pages(base_url, start_gregorian_date, end_gregorian_date, all_data)
+                if self.verify and all_data and not self.stop_flag:
+                    # سطرهای دوباره دریافت‌شده اول می‌آیند تا در حذف تاریخ‌های تکراری نگه داشته شوند
+                    repaired, _ = self._verify(base_url, start_gregorian_date, end_gregorian_date, all_data, page_log)
+                    repaired.extend(all_data)
+                    all_data = repaired
+
+            if self.stop_flag:
+                self._update_status("عملیات توسط کاربر متوقف شد.")
+                return False
+            if not all_data:
+                self._update_status("هیچ داده‌ای برای بازه تاریخ مشخص شده یافت نشد.")
+                return False
+
+            from tgju_transform import build_output_frame
+            with self.metrics.span("frame", rows=len(all_data)):
+                df = build_output_frame(all_data, start_gregorian_date, end_gregorian_date, self.metrics,
+                                        self.indicators)
+            if df.empty:
+                self._update_status("هیچ داده‌ای پس از فیلتر نهایی در بازه تاریخ یافت نشد.")
+                return False
+            extra = None
+            if self.indicators:
+                with self.metrics.span("indicators", rows=len(df)):
+                    extra = self._ohlc_frames(all_data, start_gregorian_date, end_gregorian_date)
+
+            with self.metrics.span("export", rows=len(df)):
+                write_frame(df, output_filepath, output_format, self.cancel_event, extra)
+            self._report_result({base_url: df})
+            self._update_status(f"عملیات با موفقیت انجام شد. فایل در: {output_filepath} ذخیره شد.")
+            return True
+        except Cancelled:
+            self._update_status("عملیات توسط کاربر متوقف شد.")
+            return False
+        except (ValueError, IOError, Exception) as e:
+            self._update_status(f"خطا: {e}")
+            return False
+
+    @staticmethod
+    def _ohlc_frames(all_data, start_gregorian_date, end_gregorian_date):
+        from tgju_indicators import ohlc
+        from tgju_transform import range_columns
+        columns = range_columns(all_data, start_gregorian_date, end_gregorian_date)
+        return {"weekly": ohlc(*columns, period="week"), "monthly": ohlc(*columns, period="month")}
+
+    def fetch_archive(self, base_urls, start_jalali_str, end_jalali_str, output_path, output_format=None, processes=None,
+                      cancel_event=None):
+        """
+        بازسازی خروجی فقط از صفحات موجود در کش دیسکی و بدون هیچ درخواست شبکه (مثلا پس از تغییر parser یا برای
+        بازه‌های طولانی چند نماد). تجزیه در processes پردازه انجام می‌شود (tgju_pipeline)؛ برای یک نماد خروجی
+        مانند fetch_data و برای چند نماد مانند fetch_batch است.
+        """
+        with self.metrics.run("fetch_archive", urls=list(base_urls), start=start_jalali_str, end=end_jalali_str):
+            return self._fetch_archive(base_urls, start_jalali_str, end_jalali_str, output_path, output_format, processes,
+                                       cancel_event)
+
+    def _fetch_archive(self, base_urls, start_jalali_str, end_jalali_str, output_path, output_format, processes, cancel_event):
+        self._begin_run(cancel_event)
+        try:
+            if self.transport.cache is None:
+                raise ValueError("برای بازسازی از آرشیو صفحات، کش دیسکی باید فعال باشد.")
+            start_gregorian_date = jdatetime.date.fromisoformat(start_jalali_str).togregorian()
+            end_gregorian_date = jdatetime.date.fromisoformat(end_jalali_str).togregorian()
+            if start_gregorian_date > end_gregorian_date:
+                raise ValueError("تاریخ شروع باید قبل از یا برابر با تاریخ پایان باشد.")
+
+            from tgju_pipeline import reparse_archive
+            from tgju_transform import build_output_frame
+            self._update_status(f"در حال تجزیه صفحات کش‌شده {len(base_urls)} نماد...")
+            with self.metrics.span("parse", symbols=len(base_urls)):
+                results = reparse_archive(self.transport.cache, base_urls, start_gregorian_date, end_gregorian_date,
+                                          self.parser_name, processes)
+            frames = {}
+            for base_url, rows in results.items():
+                if not rows: continue
+                with self.metrics.span("frame", rows=len(rows), symbol=symbol_name(base_url)):
+                    df = build_output_frame(rows, start_gregorian_date, end_gregorian_date, self.metrics,
+                                            self.indicators)
+                if not df.empty:
+                    frames[base_url] = df
+            if not frames:
+                self._update_status("هیچ داده‌ای برای بازه تاریخ مشخص شده در کش یافت نشد.")
+                return False
+
+            with self.metrics.span("export", symbols=len(frames)):
+                if len(results) == 1:
+                    base_url, df = next(iter(frames.items()))
+                    extra = None
+                    if self.indicators:
+                        extra = self._ohlc_frames(results[base_url], start_gregorian_date, end_gregorian_date)
+                    write_frame(df, output_path, output_format, self.cancel_event, extra)
+                    paths = [output_path]
+                else:
+                    paths = write_batch_output(frames, output_path, output_format, self.cancel_event)
+            self._report_result(frames)
+            self._update_status(f"عملیات با موفقیت انجام شد. {len(frames)} نماد از کش در {', '.join(paths)} ذخیره شد.")
+            return True
+        except Cancelled:
+            self._update_status("عملیات توسط کاربر متوقف شد.")
+            return False
+        except (ValueError, IOError, Exception) as e:
+            self._update_status(f"خطا: {e}")
+            return False
+
+    def _crawl_each(self, base_urls, start_gregorian_date, end_gregorian_date):
+        """مانند crawl_batch: {base_url: (rows, error)}."""
+        results = {}
+        for base_url in dict.fromkeys(base_urls):
+            if self.stop_flag: break
+            rows = RowBuffer()
+            try:
+                self._fetch_pages(base_url, start_gregorian_date, end_gregorian_date, rows)
+                results[base_url] = (rows, None)
+            except IOError as e:
+                self._update_status(f"خطا در دریافت {symbol_name(base_url)}: {e}")
+                results[base_url] = (rows, e)
+        return results
+
+    def fetch_batch(self, base_urls, start_jalali_str, end_jalali_str, output_path, output_format=None,
+                    cancel_event=None):
+        """
+        استخراج چند نماد با یک استخر مشترک (tgju_batch.crawl_batch). خروجی یک فایل اکسل چندشیتی
+        (اگر output_path با .xlsx تمام شود) یا یک پوشه با فایل جداگانه برای هر نماد است.
+        """
+        with self.metrics.run("fetch_batch", urls=list(base_urls), start=start_jalali_str, end=end_jalali_str):
+            try:
+                return self._fetch_batch(base_urls, start_jalali_str, end_jalali_str, output_path, output_format,
+                                         cancel_event)
+            finally:
+                self.transport.save_rates()
+
+    def _fetch_batch(self, base_urls, start_jalali_str, end_jalali_str, output_path, output_format, cancel_event):
+        self._begin_run(cancel_event)
+        try:
+            start_gregorian_date = jdatetime.date.fromisoformat(start_jalali_str).togregorian()
+            end_gregorian_date = jdatetime.date.fromisoformat(end_jalali_str).togregorian()
+            if start_gregorian_date > end_gregorian_date:
+                raise ValueError("تاریخ شروع باید قبل از یا برابر با تاریخ پایان باشد.")
+
+            self._update_status(f"در حال جمع‌آوری داده‌های {len(base_urls)} نماد از {start_jalali_str} تا {end_jalali_str}...")
+            if self.source.date_bounded:
+                # منابع با بازه تاریخ برای هر نماد چند درخواست بیشتر لازم ندارند و نمادها به ترتیب دریافت می‌شوند
+                results = self._crawl_each(base_urls, start_gregorian_date, end_gregorian_date)
+            else:
+                results = crawl_batch(self, base_urls, start_gregorian_date, end_gregorian_date)
+            if self.stop_flag:
+                self._update_status("عملیات توسط کاربر متوقف شد.")
+                return False
+
+            from tgju_transform import build_output_frame
+            frames = {}
+            failed = []
+            for base_url, (rows, error) in results.items():
+                df = None
+                if rows:
+                    with self.metrics.span("frame", rows=len(rows), symbol=symbol_name(base_url)):
+                        df = build_output_frame(rows, start_gregorian_date, end_gregorian_date, self.metrics,
+                                                self.indicators)
+                if error is not None or df is None or df.empty:
+                    failed.append(symbol_name(base_url))
+                else:
+                    frames[base_url] = df
+            if not frames:
+                self._update_status("هیچ داده‌ای برای بازه تاریخ مشخص شده یافت نشد.")
+                return False
+
+            with self.metrics.span("export", symbols=len(frames)):
+                paths = write_batch_output(frames, output_path, output_format, self.cancel_event)
+            self._report_result(frames)
+            message = f"عملیات با موفقیت انجام شد. {len(frames)} نماد در {', '.join(paths)} ذخیره شد."
+            if failed:
+                message += f" نمادهای بدون داده یا با خطا: {', '.join(failed)}"
+            self._update_status(message)
+            return True
+        except Cancelled:
+            self._update_status("عملیات توسط کاربر متوقف شد.")
+            return False
+        except (ValueError, IOError, Exception) as e:
+            self._update_status(f"خطا: {e}")
+            return False
@@ -0,0 +1,171 @@
+import math
+from collections import deque
+
+
+# --- شاخص‌های تکنیکال روی سری قیمت میانگین روزانه ---
+# دو مسیر با خروجی یکسان:
+# - daily_indicators و ohlc: محاسبه برداری روی کل سری (pandas/numpy فقط داخل همین توابع import می‌شوند)
+# - IndicatorState: به‌روزرسانی افزایشی شاخص‌های روزانه (همان daily_indicators) با هزینه O(1) برای هر سطر
+#   جدید (مثلا در tgju_daemon)؛ جدول‌های OHLC فقط در خروجی و با ohlc ساخته می‌شوند
+
+SMA_WINDOWS = (7, 30)
+EMA_SPANS = (20,)
+VOLATILITY_WINDOW = 30
+PERIODS = ("week", "month")
+OHLC_COLUMNS = ["دوره", "باز", "بیشترین", "کمترین", "بسته", "روزها"]
+
+
+def indicator_columns(sma=SMA_WINDOWS, ema=EMA_SPANS, volatility=VOLATILITY_WINDOW):
+    return ([f"میانگین متحرک {n}" for n in sma] + [f"میانگین نمایی {n}" for n in ema]
+            + [f"نوسان {volatility} روزه (%)", "افت از سقف (%)"])
+
+
+def _round_price(value):
+    return None if value is None else round(value)
+
+
+def _round_percent(value):
+    return None if value is None else round(value, 3)
+
+
+def daily_indicators(average, sma=SMA_WINDOWS, ema=EMA_SPANS, volatility=VOLATILITY_WINDOW):
+    """
+    {نام ستون: آرایه} برای سری میانگین روزانه به ترتیب صعودی تاریخ:
+    میانگین متحرک ساده، میانگین نمایی (adjust=False، مقدار اولیه اولین قیمت)، انحراف معیار بازده لگاریتمی
+    روزانه در پنجره volatility روزه و فاصله از بالاترین قیمت تا آن روز، هر دو به درصد.
+    روزهای قبل از پر شدن پنجره NaN هستند.
+    """
+    import numpy as np
+    import pandas as pd
+
+    prices = pd.Series(np.asarray(average, dtype=np.float64))
+    names = iter(indicator_columns(sma, ema, volatility))
+    columns = {}
+    for n in sma:
+        columns[next(names)] = prices.rolling(n).mean().round().to_numpy()
+    for n in ema:
+        columns[next(names)] = prices.ewm(span=n, adjust=False).mean().round().to_numpy()
+    returns = np.log(prices).diff()
+    columns[next(names)] = (returns.rolling(volatility).std() * 100).round(3).to_numpy()
+    columns[next(names)] = ((prices / prices.cummax() - 1) * 100).round(3).to_numpy()
+    return columns
+
+
+def _period_keys(ordinals, period):
+    import numpy as np
+
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    if period == "week":
+        return ordinals - (ordinals + 1) % 7
+    if period == "month":
+        from tgju_transform import jalali_components
+        year, month, _ = jalali_components(ordinals)
+        return year * 100 + month
+    raise ValueError(f"دوره ناشناخته: {period}. گزینه‌های مجاز: {', '.join(PERIODS)}")
+
+
+def _period_labels(keys, period):
+    if period == "week":
+        from tgju_transform import jalali_iso_strings
+        return jalali_iso_strings(keys)
+    return [f"{key // 100}-{key % 100:02d}" for key in keys]
+
+
+def ohlc(ordinals, high, low, average, period="week"):
+    """
+    جدول OHLC هفتگی یا ماهانه تقویم شمسی از سطرهای روزانه مرتب: باز و بسته میانگین اولین و آخرین روز،
+    بیشترین و کمترین حداکثر و حداقل روزهای دوره. برچسب هفته تاریخ شمسی شنبه اول آن و برچسب ماه YYYY-MM است.
+    """
+    import pandas as pd
+
+    if len(ordinals) == 0:
+        return pd.DataFrame(columns=OHLC_COLUMNS)
+    days = pd.DataFrame({"key": _period_keys(ordinals, period), "high": high, "low": low, "average": average})
+    bars = days.groupby("key", sort=True).agg(open=("average", "first"), high=("high", "max"),
+                                               low=("low", "min"), close=("average", "last"),
+                                               days=("average", "size"))
+    bars.insert(0, "label", _period_labels(bars.index.to_numpy(), period))
+    bars.columns = OHLC_COLUMNS
+    return bars.reset_index(drop=True)
+
+
+# --- کلاس IndicatorState: وضعیت غلتان شاخص‌ها برای به‌روزرسانی افزایشی ---
+class IndicatorState:
+    """
+    سطرها به ترتیب تاریخ با update اضافه می‌شوند و مقادیر شاخص‌های همان روز (مانند daily_indicators) برگردانده
+    می‌شود. فقط پنجره‌های لازم (حداکثر طول پنجره‌ها)، مقدار EMA و بالاترین قیمت نگه داشته می‌شوند، پس هزینه هر سطر مستقل از طول تاریخچه است. update دوباره برای همان آخرین تاریخ (قیمت روز جاری که
+    در طول روز تغییر می‌کند) سطر قبلی آن روز را جایگزین می‌کند.
+    """
+
+    def __init__(self, sma=SMA_WINDOWS, ema=EMA_SPANS, volatility=VOLATILITY_WINDOW):
+        self.sma = tuple(sma)
+        self.ema = tuple(ema)
+        self.volatility = volatility
+        self.columns = indicator_columns(self.sma, self.ema, self.volatility)
+        self.last_ordinal = None
+        self._count = 0
+        self._window = deque(maxlen=max(self.sma, default=1))
+        self._sums = {n: 0 for n in self.sma}
+        self._ema = {n: None for n in self.ema}
+        self._previous = None
+        self._returns = deque(maxlen=volatility)
+        self._return_sum = 0.0
+        self._return_sumsq = 0.0
+        self._peak = None
+        self._undo = None
+
+    def _snapshot(self):
+        # همه بخش‌ها اندازه ثابت دارند (پنجره‌ها محدودند)
+        return (self.last_ordinal, self._count, self._window.copy(), dict(self._sums), dict(self._ema),
+                self._previous, self._returns.copy(), self._return_sum, self._return_sumsq, self._peak)
+
+    def _restore(self, snapshot):
+        (self.last_ordinal, self._count, self._window, self._sums, self._ema, self._previous, self._returns,
+         self._return_sum, self._return_sumsq, self._peak) = snapshot
+
+    def update(self, ordinal, high, low, average):
+        """{نام ستون: مقدار یا None} شاخص‌های روز ordinal."""
+        if self.last_ordinal is not None and ordinal < self.last_ordinal:
+            raise ValueError("سطرها باید به ترتیب تاریخ اضافه شوند.")
+        if ordinal == self.last_ordinal:
+            self._restore(self._undo)
+        self._undo = self._snapshot()
+        self.last_ordinal = ordinal
+        self._count += 1
+
+        values = []
+        for n in self.sma:
+            if len(self._window) >= n:
+                self._sums[n] -= self._window[-n]
+            self._sums[n] += average
+        self._window.append(average)
+        values.extend(self._sums[n] / n if self._count >= n else None for n in self.sma)
+
+        for n in self.ema:
+            previous = self._ema[n]
+            alpha = 2 / (n + 1)
+            self._ema[n] = float(average) if previous is None else alpha * average + (1 - alpha) * previous
+            values.append(self._ema[n])
+
+        if self._previous is not None:
+            if len(self._returns) == self.volatility:
+                dropped = self._returns[0]
+                self._return_sum -= dropped
+                self._return_sumsq -= dropped * dropped
+            value = math.log(average / self._previous)
+            self._returns.append(value)
+            self._return_sum += value
+            self._return_sumsq += value * value
+        self._previous = average
+        n = len(self._returns)
+        volatility = None
+        if n == self.volatility and n > 1:
+            variance = max(0.0, (self._return_sumsq - self._return_sum * self._return_sum / n) / (n - 1))
+            volatility = math.sqrt(variance) * 100
+        values.append(volatility)
+
+        self._peak = average if self._peak is None else max(self._peak, average)
+        values.append((average / self._peak - 1) * 100)
+
+        rounding = [_round_price] * (len(self.sma) + len(self.ema)) + [_round_percent] * 2
+        return {name: round_value(value) for name, round_value, value in zip(self.columns, rounding, values)}
@@ -0,0 +1,191 @@
+import datetime as dt
+from collections import namedtuple
+
+import jdatetime
+
+from tgju_store import merge_ranges
+
+# --- بررسی یکپارچگی سطرهای استخراج‌شده و تعیین صفحات/بازه‌هایی که باید دوباره دریافت شوند ---
+
+ONE_DAY = dt.timedelta(days=1)
+# تعطیلات ثابت شمسی (ماه، روز): نوروز، ۱۲ و ۱۳ فروردین، ۱۴ و ۱۵ خرداد، ۲۲ بهمن، ۲۹ اسفند.
+# تعطیلات قمری هر سال جابه‌جا می‌شوند و اینجا نیستند؛ این روزها اگر داخل صفحات سالم باشند بدون درخواست
+# اضافه بدون سطر شناخته می‌شوند (check_rows) و در غیر این صورت دریافت دوباره هم سطری برایشان پیدا نمی‌کند.
+FIXED_HOLIDAYS = frozenset({(1, 1), (1, 2), (1, 3), (1, 4), (1, 12), (1, 13), (3, 14), (3, 15), (11, 22), (12, 29)})
+# datetime.weekday: جمعه = 4
+WEEKEND = (4,)
+# بازه‌های دریافت دوباره نزدیک‌تر از این فاصله با هم یکی می‌شوند (حدود یک صفحه HTML)
+MERGE_WINDOW_DAYS = 30
+
+PageInfo = namedtuple("PageInfo", ["page", "count", "newest", "oldest", "invalid", "final"])
+
+
+# --- کلاس TradingCalendar: روزهای معاملاتی مورد انتظار ---
+class TradingCalendar:
+    def __init__(self, weekend=WEEKEND, holidays=FIXED_HOLIDAYS):
+        self.weekend = frozenset(weekend)
+        self.holidays = frozenset(holidays)
+
+    def is_trading_day(self, gregorian_date):
+        if gregorian_date.weekday() in self.weekend:
+            return False
+        jdate = jdatetime.date.fromgregorian(date=gregorian_date)
+        return (jdate.month, jdate.day) not in self.holidays
+
+    def expected_days(self, start_gregorian_date, end_gregorian_date):
+        day = start_gregorian_date
+        while day <= end_gregorian_date:
+            if self.is_trading_day(day):
+                yield day
+            day += ONE_DAY
+
+
+# --- کلاس PageLog: خلاصه صفحات دریافت‌شده در یک استخراج ---
+class PageLog:
+    """
+    برای هر صفحه (از هر منبع) تعداد سطرهای داده‌ای، جدیدترین و قدیمی‌ترین تاریخ و تاریخ سطرهای نامعتبر
+    (عدد غیرقابل تبدیل) را نگه می‌دارد؛ TGJUGoldFetcher._process_rows آن را پر می‌کند.
+    """
+
+    def __init__(self):
+        self.pages = []
+        self._before_range = None
+
+    def record(self, page, count, newest, oldest, invalid, end_gregorian_date):
+        if not count: return
+        info = PageInfo(page, count, newest, oldest, tuple(invalid), False)
+        # از صفحات کاملا جدیدتر از بازه (پیمایش بدون جستجو یا ادامه HTML پس از فید) فقط آخری برای مرز بازه لازم است
+        if oldest > end_gregorian_date:
+            self._before_range = info
+            return
+        if self._before_range is not None:
+            if self._before_range.page == page - 1:
+                self.pages.append(self._before_range)
+            self._before_range = None
+        self.pages.append(info)
+
+    def finish(self):
+        """آخرین صفحه استخراج کامل‌شده (که کوتاه بودنش عادی است) علامت زده می‌شود."""
+        if self.pages:
+            self.pages[-1] = self.pages[-1]._replace(final=True)
+
+    def replaced(self, infos):
+        """نسخه‌ای که صفحات infos (مثلا صفحات دوباره دریافت‌شده) جای صفحات هم‌شماره را گرفته‌اند."""
+        by_page = {info.page: info for info in infos}
+        log = PageLog()
+        log.pages = [by_page[info.page]._replace(final=info.final) if info.page in by_page else info
+                     for info in self.pages]
+        return log
+
+    def healthy(self, index):
+        # صفحه‌ای که از صفحه بعدی (قدیمی‌تر) کوتاه‌تر است ناقص دریافت شده؛ اندازه صفحات جز صفحه آخر ثابت است
+        info = self.pages[index]
+        if info.invalid: return False
+        if info.final or index + 1 >= len(self.pages): return True
+        return info.count >= self.pages[index + 1].count
+
+    def locate(self, day):
+        """اندیس صفحاتی که day باید در آن‌ها باشد (یک صفحه یا دو صفحه مرز)؛ [] اگر خارج از صفحات باشد."""
+        for i, info in enumerate(self.pages):
+            if info.oldest <= day <= info.newest:
+                return [i]
+            if i + 1 < len(self.pages) and self.pages[i + 1].newest < day < info.oldest:
+                return [i, i + 1]
+        return []
+
+
+# --- کلاس IntegrityReport ---
+class IntegrityReport:
+    def __init__(self):
+        # روزهای معاملاتی بدون سطر که باید دوباره دریافت شوند
+        self.missing = []
+        # روزهای معاملاتی بدون سطر که صفحات سالم اطرافشان نشان می‌دهد سایت برایشان سطری ندارد
+        self.closed = []
+        # تاریخ‌های تکراری با مقادیر متفاوت و سطرهای با مقدار نامعتبر (حداکثر کمتر از حداقل یا غیرمثبت)
+        self.conflicting = []
+        self.corrupt = []
+        # تاریخ سطرهایی که هنگام دریافت به دلیل عدد نامعتبر کنار گذاشته شدند
+        self.invalid = []
+        # شماره صفحاتی که باید دوباره دریافت شوند، بازه تاریخ سطرهای همان صفحات (برای منابع با بازه تاریخ
+        # که شماره صفحه‌شان پایدار نیست) و بازه‌های تاریخی که صفحه‌شان معلوم نیست
+        self.pages = []
+        self.page_spans = []
+        self.windows = []
+
+    @property
+    def ok(self):
+        return not (self.pages or self.windows)
+
+    def summary(self):
+        return (f"{len(self.missing)} روز ناموجود، {len(self.invalid)} سطر نامعتبر، "
+                f"{len(self.conflicting)} تاریخ تکراری متناقض، {len(self.corrupt)} سطر با مقدار غیرمنطقی")
+
+
+def merge_windows(days, gap_days=MERGE_WINDOW_DAYS):
+    """تاریخ‌ها -> بازه‌های [شروع، پایان]؛ تاریخ‌های با فاصله کمتر از gap_days در یک بازه."""
+    windows = []
+    for day in sorted(set(days)):
+        if windows and (day - windows[-1][1]).days <= gap_days:
+            windows[-1] = (windows[-1][0], day)
+        else:
+            windows.append((day, day))
+    return windows
+
+
+def check_rows(all_data, start_gregorian_date, end_gregorian_date, calendar=None, page_log=None, newest_date=None):
+    """
+    all_data: سطرهای (gdate, high, low, avg) استخراج (ممکن است تکراری داشته باشد). newest_date جدیدترین تاریخ
+    منتشرشده در سایت است تا روزهای هنوز منتشرنشده ناموجود شمرده نشوند.
+    با page_log هر روز ناموجود به صفحه(های) خودش نگاشته می‌شود: اگر آن صفحات سالم باشند سایت برای آن روز
+    سطری ندارد و فقط صفحات ناقص یا دارای سطر نامعتبر دوباره دریافت می‌شوند. روزهای خارج از page_log (مثلا سطرهای
+    بازیابی‌شده از نقطه بازیابی) به صورت بازه‌های تاریخ گزارش می‌شوند.
+    """
+    calendar = calendar or TradingCalendar()
+    report = IntegrityReport()
+    rows = {}
+    for gdate, high, low, average in all_data:
+        row = (high, low, average)
+        previous = rows.setdefault(gdate, row)
+        if previous != row and gdate not in report.conflicting:
+            report.conflicting.append(gdate)
+        if high < low or low <= 0:
+            report.corrupt.append(gdate)
+
+    last_day = end_gregorian_date if newest_date is None else min(end_gregorian_date, newest_date)
+    absent = [d for d in calendar.expected_days(start_gregorian_date, last_day) if d not in rows]
+
+    # اندیس صفحات در page_log
+    pages = set()
+    windows = set(report.conflicting) | set(report.corrupt)
+    if page_log is not None:
+        for i, info in enumerate(page_log.pages):
+            invalid = [d for d in info.invalid if start_gregorian_date <= d <= end_gregorian_date]
+            report.invalid.extend(invalid)
+            # صفحه ناقص خارج از بازه فقط وقتی مهم است که سطرهای افتاده‌اش داخل بازه باشند (روز ناموجود در مرز)
+            if invalid or (not page_log.healthy(i) and info.oldest <= end_gregorian_date
+                           and info.newest >= start_gregorian_date):
+                pages.add(i)
+    for day in absent:
+        located = page_log.locate(day) if page_log is not None else []
+        if located and all(page_log.healthy(i) for i in located):
+            report.closed.append(day)
+            continue
+        report.missing.append(day)
+        if located:
+            # در مرز دو صفحه فقط صفحه ناسالم دوباره دریافت می‌شود؛ سطرهای صفحه سالم کامل‌اند
+            pages.update(i for i in located if not page_log.healthy(i))
+        else:
+            windows.add(day)
+    if page_log is not None:
+        # تاریخ‌های نامعتبر و غیرمنطقی که صفحه‌شان معلوم است با همان صفحه دوباره دریافت می‌شوند
+        for day in list(windows):
+            located = page_log.locate(day)
+            if located:
+                pages.update(located)
+                windows.discard(day)
+    report.pages = sorted({page_log.pages[i].page for i in pages})
+    report.page_spans = merge_ranges(
+        (max(page_log.pages[i].oldest, start_gregorian_date), min(page_log.pages[i].newest, end_gregorian_date))
+        for i in pages)
+    report.windows = merge_windows(windows)
+    return report
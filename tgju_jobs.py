@@ -0,0 +1,197 @@
+import itertools
+import queue
+import threading
+import weakref
+
+# --- لغو مشترک و اجرای صف‌بندی‌شده کارهای استخراج ---
+
+
+class Cancelled(Exception):
+    """عملیات به دلیل فعال شدن رویداد لغو (توقف توسط کاربر) نیمه‌کاره رها شد."""
+
+
+class CancelEvent(threading.Event):
+    """
+    threading.Event که می‌تواند رویدادهای فرزند داشته باشد: فعال شدن والد همه فرزندان را فعال می‌کند
+    ولی لغو یک فرزند (مثلا صفحات اضافی پنجره یک استخراج) روی والد اثری ندارد.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._children = weakref.WeakSet()
+        self._children_lock = threading.Lock()
+
+    def set(self):
+        super().set()
+        with self._children_lock:
+            children = list(self._children)
+        for child in children:
+            child.set()
+
+    def child(self):
+        child = CancelEvent()
+        with self._children_lock:
+            self._children.add(child)
+        if self.is_set():
+            child.set()
+        return child
+
+
+class Job:
+    QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+    def __init__(self, job_id, description, func):
+        self.id = job_id
+        self.description = description
+        self.func = func
+        self.state = Job.QUEUED
+        self.result = None
+        self.error = None
+        # cancel() آن را فعال می‌کند؛ func آن را به کار خودش می‌دهد (مثلا fetch_data(cancel_event=...))
+        self.cancel_event = CancelEvent()
+
+
+# --- کلاس JobExecutor: یک ترد کارگر ماندگار با صف کارها ---
+class JobExecutor:
+    """
+    کارها به ترتیب ثبت در یک ترد کارگر ماندگار (daemon) اجرا می‌شوند؛ برای هر شروع ترد جدیدی ساخته
+    نمی‌شود. on_change(job) هنگام هر تغییر وضعیت یک کار از ترد کارگر فراخوانی می‌شود.
+    """
+
+    def __init__(self, on_change=None):
+        self.on_change = on_change
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._current = None
+        self._thread = None
+        self._closed = False
+
+    def submit(self, description, func):
+        """func(job) در ترد کارگر اجرا و مقدار برگشتی آن در job.result ذخیره می‌شود."""
+        job = Job(next(self._ids), description, func)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("JobExecutor بسته شده است.")
+            self._pending.append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="tgju-jobs", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+        self._notify(job)
+        return job
+
+    @property
+    def current(self):
+        return self._current
+
+    @property
+    def pending(self):
+        with self._lock:
+            return list(self._pending)
+
+    def cancel(self, job):
+        with self._lock:
+            if job.state == Job.QUEUED:
+                job.state = Job.CANCELLED
+                self._pending.remove(job)
+        job.cancel_event.set()
+        self._notify(job)
+
+    def cancel_all(self):
+        for job in self.pending:
+            self.cancel(job)
+        with self._lock:
+            current = self._current
+        if current is not None:
+            self.cancel(current)
+
+    def shutdown(self):
+        self._closed = True
+        self.cancel_all()
+        self._queue.put(None)
+
+    def _notify(self, job):
+        if self.on_change:
+            self.on_change(job)
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None: return
+            with self._lock:
+                if job.state == Job.CANCELLED: continue
+                self._pending.remove(job)
+                job.state = Job.RUNNING
+                self._current = job
+            self._notify(job)
+            try:
+                job.result = job.func(job)
+                job.state = Job.CANCELLED if job.cancel_event.is_set() else Job.DONE
+            except Cancelled:
+                job.state = Job.CANCELLED
+            except Exception as e:
+                job.error = e
+                job.state = Job.FAILED
+            finally:
+                with self._lock:
+                    self._current = None
+            self._notify(job)
+
+
+# --- کلاس StatusChannel: انتقال پیام‌های وضعیت و پیشرفت از ترد کارگر به رابط کاربری ---
+class StatusChannel:
+    """
+    ترد کارگر با post و progress پیام می‌فرستد (بدون تماس مستقیم با Tk)؛ رابط کاربری در یک تیک با نرخ
+    ثابت drain را فراخوانی می‌کند. از پیام‌های عادی فقط آخرین پیام نمایش داده می‌شود و هشدارها به جای
+    نمایش تک‌تک، بر اساس نوع شمرده می‌شوند.
+    """
+
+    WARNING_PREFIX = "هشدار"
+    # زیررشته پیام هشدار -> برچسب شمارنده
+    WARNING_KINDS = (("داده نامعتبر", "سطر نامعتبر"), ("خطای گذرا", "تلاش مجدد"))
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._clear()
+
+    def _clear(self):
+        self.message = None
+        self.warnings = {}
+        self.done = 0
+        self.total = None
+
+    def reset(self):
+        """شروع یک کار جدید: شمارنده‌ها و پیشرفت به ترتیب رسیدن پیام‌ها صفر می‌شوند."""
+        self._queue.put(("reset", None))
+
+    def post(self, message):
+        self._queue.put(("message", message))
+
+    def progress(self, done, total):
+        """done صفحه پردازش شده از حدود total صفحه (None اگر هنوز تخمینی وجود ندارد)."""
+        self._queue.put(("progress", (done, total)))
+
+    def drain(self):
+        """همه پیام‌های رسیده را ادغام می‌کند؛ True اگر چیزی تغییر کرده باشد. فقط از ترد رابط کاربری."""
+        changed = False
+        while True:
+            try:
+                kind, value = self._queue.get_nowait()
+            except queue.Empty:
+                return changed
+            changed = True
+            if kind == "reset":
+                self._clear()
+            elif kind == "progress":
+                self.done, self.total = value
+            elif value.startswith(self.WARNING_PREFIX):
+                label = next((label for key, label in self.WARNING_KINDS if key in value), "سایر")
+                self.warnings[label] = self.warnings.get(label, 0) + 1
+            else:
+                self.message = value
+
+    def warnings_text(self):
+        if not self.warnings: return ""
+        return "هشدارها: " + " | ".join(f"{label} {count}" for label, count in self.warnings.items())
@@ -0,0 +1,172 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# --- اندازه‌گیری مسیرهای پرمصرف: بازه‌های زمانی (span)، شمارنده‌ها و رویدادهای ساخت‌یافته ---
+# نام مراحل و شمارنده‌ها انگلیسی و ثابت‌اند تا در ابزارهای پایش (Prometheus، jq و ...) قابل جستجو باشند:
+#   مراحل: download (کل دریافت یک صفحه با تلاش‌های مجدد و کش)، http (هر درخواست)، ttfb (تا دریافت هدرها)،
+#          parse (تجزیه HTML)، rows (استخراج و تبدیل سطرها)، frame (ساخت DataFrame)، jalali (تبدیل تاریخ)،
+#          indicators (جدول‌های OHLC)، export
+#   شمارنده‌ها: bytes، requests، retries، cache، pages، rows
+
+
+class Metrics:
+    """
+    بدون exporter فقط مقادیر تجمعی در حافظه نگه داشته می‌شوند (هزینه ناچیز)؛ هر exporter رویدادها را
+    هنگام وقوع (emit) و خلاصه هر اجرا را در پایان آن (finish) دریافت می‌کند.
+    اگر profile_dir داده شود، هر اجرا با cProfile پروفایل و در {profile_dir}/{run_id}.prof ذخیره می‌شود
+    (cProfile فقط ترد فراخواننده را می‌بیند؛ در حالت چندتردی دریافت صفحات در ترد‌های استخر است).
+    """
+
+    def __init__(self, exporters=(), profile_dir=None):
+        self.exporters = list(exporters)
+        self.profile_dir = profile_dir
+        self.run_id = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # stage -> [تعداد، مجموع ثانیه، بیشینه ثانیه]
+            self.timings = {}
+            # (name, ((label, value), ...)) -> مقدار
+            self.counters = {}
+
+    def _emit(self, event):
+        if not self.exporters: return
+        event = {"ts": round(time.time(), 6), "run_id": self.run_id, **event}
+        for exporter in self.exporters:
+            exporter.emit(event)
+
+    def observe(self, stage, seconds, **fields):
+        with self._lock:
+            stat = self.timings.setdefault(stage, [0, 0.0, 0.0])
+            stat[0] += 1
+            stat[1] += seconds
+            stat[2] = max(stat[2], seconds)
+        self._emit({"type": "span", "stage": stage, "seconds": round(seconds, 6), **fields})
+
+    @contextmanager
+    def span(self, stage, **fields):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - t0, **fields)
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        self._emit({"type": "count", "name": name, "value": value, **labels})
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "timings": {stage: {"count": c, "seconds": s, "max": m} for stage, (c, s, m) in self.timings.items()},
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in self.counters.items()],
+            }
+
+    @contextmanager
+    def run(self, name, **fields):
+        """یک اجرای کامل (مثلا fetch_data): مقادیر صفر می‌شوند و در پایان خلاصه به exporterها داده می‌شود."""
+        self.reset()
+        self.run_id = uuid.uuid4().hex[:12]
+        profiler = None
+        if self.profile_dir:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        self._emit({"type": "run_start", "name": name, **fields})
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - t0
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{self.run_id}.prof"))
+            self._emit({"type": "run_end", "name": name, "seconds": round(elapsed, 6)})
+            snapshot = self.snapshot()
+            for exporter in self.exporters:
+                exporter.finish(snapshot)
+
+
+# --- exporterها ---
+class JsonLinesExporter:
+    """هر رویداد یک خط JSON در فایل (افزودنی) یا stream (پیش‌فرض stderr)."""
+
+    def __init__(self, path=None, stream=None):
+        self.path = path
+        self.stream = stream if stream is not None or path else sys.stderr
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            else:
+                self.stream.write(line)
+
+    def finish(self, snapshot):
+        pass
+
+
+def _prom_labels(labels):
+    if not labels: return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def render_prometheus(snapshot, prefix="tgju"):
+    """خلاصه یک اجرا در قالب متنی Prometheus."""
+    lines = [
+        f"# HELP {prefix}_stage_seconds_total Total time spent in each stage.",
+        f"# TYPE {prefix}_stage_seconds_total counter",
+    ]
+    timings = sorted(snapshot["timings"].items())
+    lines += [f'{prefix}_stage_seconds_total{{stage="{stage}"}} {t["seconds"]:.6f}' for stage, t in timings]
+    lines += [f"# TYPE {prefix}_stage_calls_total counter"]
+    lines += [f'{prefix}_stage_calls_total{{stage="{stage}"}} {t["count"]}' for stage, t in timings]
+    lines += [f"# TYPE {prefix}_stage_seconds_max gauge"]
+    lines += [f'{prefix}_stage_seconds_max{{stage="{stage}"}} {t["max"]:.6f}' for stage, t in timings]
+    seen = set()
+    for counter in sorted(snapshot["counters"], key=lambda c: (c["name"], _prom_labels(c["labels"]))):
+        metric = f'{prefix}_{counter["name"]}_total'
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter")
+            seen.add(metric)
+        lines.append(f"{metric}{_prom_labels(counter['labels'])} {counter['value']}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusExporter:
+    """
+    در پایان هر اجرا خلاصه را در path می‌نویسد (مناسب textfile collector در node_exporter).
+    آخرین متن در self.text هم نگه داشته می‌شود تا در یک endpoint HTTP برگردانده شود.
+    """
+
+    def __init__(self, path=None, prefix="tgju"):
+        self.path = path
+        self.prefix = prefix
+        self.text = ""
+
+    def emit(self, event):
+        pass
+
+    def finish(self, snapshot):
+        self.text = render_prometheus(snapshot, self.prefix)
+        if self.path:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.text)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,79 @@
+import html as html_lib
+import importlib.util
+import re
+
+# هر backend یک تابع است که HTML یک صفحه را می‌گیرد و برای هر سطر داده‌ای جدول تاریخچه
+# یک تاپل (تاریخ میلادی، حداکثر، حداقل) به صورت رشته و بدون جداکننده هزارگان تولید می‌کند.
+# سطر داده‌ای سطری است که حداقل ۶ ستون دارد و ستون اول آن تاریخ YYYY-MM-DD است.
+# bs4 و lxml فقط هنگام اولین استفاده از backend مربوط import می‌شوند (شروع سریع‌تر tgju_cli).
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def _data_row(cols):
+    if len(cols) >= 6 and DATE_RE.match(cols[0]):
+        return cols[0], cols[1], cols[2]
+    return None
+
+
+def _iter_soup_rows(soup):
+    for r in soup.find_all("tr"):
+        row = _data_row([c.get_text(strip=True).replace(',', '') for c in r.find_all("td")])
+        if row: yield row
+
+
+def parse_html_parser(html):
+    """مسیر قبلی: ساخت کامل درخت DOM با html.parser."""
+    from bs4 import BeautifulSoup
+    return _iter_soup_rows(BeautifulSoup(html, "html.parser"))
+
+
+def parse_strainer(html):
+    """همان html.parser ولی فقط تگ‌های tr (و فرزندانشان) ساخته می‌شوند."""
+    from bs4 import BeautifulSoup, SoupStrainer
+    return _iter_soup_rows(BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("tr")))
+
+
+def parse_lxml(html):
+    import lxml.html
+    doc = lxml.html.fromstring(html)
+    for r in doc.iter("tr"):
+        # معادل get_text(strip=True): هر تکه متن جداگانه strip و سپس به هم چسبانده می‌شود
+        cols = ["".join(t.strip() for t in c.itertext()).replace(',', '') for c in r.iter("td")]
+        row = _data_row(cols)
+        if row: yield row
+
+
+_TR_RE = re.compile(r"<tr\b[^>]*>(.*?)(?=<tr\b|</tr\s*>|</table\s*>)", re.IGNORECASE | re.DOTALL)
+_TD_RE = re.compile(r"<td\b[^>]*>(.*?)(?=<td\b|</td\s*>|$)", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+_SKIP_RE = re.compile(r"<!--.*?-->|<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+
+
+def _cell_text(cell):
+    return "".join(html_lib.unescape(t).strip() for t in _TAG_RE.split(cell)).replace(',', '')
+
+
+def parse_regex(html):
+    """توکنایزر جریانی: بدون ساخت درخت، سطرها را به ترتیب ظاهر شدن در صفحه تولید می‌کند."""
+    for tr in _TR_RE.finditer(_SKIP_RE.sub("", html)):
+        row = _data_row([_cell_text(td.group(1)) for td in _TD_RE.finditer(tr.group(1))])
+        if row: yield row
+
+
+PARSERS = {
+    "html.parser": parse_html_parser,
+    "strainer": parse_strainer,
+    "lxml": parse_lxml,
+    "regex": parse_regex,
+}
+
+
+def get_parser(name):
+    try:
+        parser = PARSERS[name]
+    except KeyError:
+        raise ValueError(f"پارسر ناشناخته: {name}. گزینه‌های مجاز: {', '.join(PARSERS)}")
+    if parser is parse_lxml and importlib.util.find_spec("lxml") is None:
+        raise ValueError("برای استفاده از پارسر lxml باید بسته lxml نصب شود.")
+    return parser
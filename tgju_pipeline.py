@@ -0,0 +1,77 @@
+import datetime as dt
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from tgju_parsers import get_parser
+from tgju_store import RowBuffer
+
+# --- مرحله تجزیه چندپردازه‌ای: جدا کردن دریافت صفحات از تجزیه HTML ---
+# تجزیه با BeautifulSoup کاملاً CPU-bound است و به دلیل GIL با ترد موازی نمی‌شود؛ اینجا هر صفحه در یک
+# پردازه جداگانه تجزیه و فقط تاپل‌های فشرده (ordinal میلادی، حداکثر، حداقل) برگردانده می‌شوند.
+# در ویندوز (و نسخه PyInstaller) فراخوانی باید داخل if __name__ == "__main__" باشد.
+
+
+def parse_rows(html, parser="strainer"):
+    """[(ordinal, high, low)] سطرهای یک صفحه؛ سطرهای با عدد نامعتبر کنار گذاشته می‌شوند."""
+    rows = []
+    for date_str, high_str, low_str in get_parser(parser)(html):
+        try:
+            rows.append((dt.date.fromisoformat(date_str).toordinal(), int(high_str), int(low_str)))
+        except ValueError:
+            continue
+    return rows
+
+
+def _parse_archived_page(task):
+    # در پردازه کارگر اجرا می‌شود: بدنه از دیسک خوانده می‌شود تا فقط مسیر فایل بین پردازه‌ها منتقل شود
+    page, path, encoding, parser = task
+    with open(path, "rb") as f:
+        html = f.read().decode(encoding or "utf-8", errors="replace")
+    return page, parse_rows(html, parser)
+
+
+def parse_pages(tasks, parser="strainer", processes=None):
+    """
+    tasks: [(شماره صفحه، مسیر فایل HTML، encoding)]. خروجی (شماره صفحه، سطرها) به ترتیب ورودی است.
+    processes=1 بدون ساخت استخر و در همین پردازه اجرا می‌شود؛ None یعنی به تعداد هسته‌ها.
+    """
+    tasks = [(page, path, encoding, parser) for page, path, encoding in tasks]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) < 2:
+        return [_parse_archived_page(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        # تکه‌های چندصفحه‌ای هزینه رفت و برگشت بین پردازه‌ها را کم می‌کنند
+        chunksize = max(1, len(tasks) // (processes * 8))
+        return list(pool.map(_parse_archived_page, tasks, chunksize=chunksize))
+
+
+def merge_rows(parsed_pages, start_gregorian_date, end_gregorian_date):
+    """
+    سطرهای صفحات را بر اساس تاریخ ادغام و حذف تکراری می‌کند (اولین صفحه‌ای که تاریخ در آن آمده معتبر است)
+    و سطرهای داخل بازه را از جدید به قدیم، به همان ترتیب استخراج عادی، در یک RowBuffer برمی‌گرداند.
+    """
+    start, end = start_gregorian_date.toordinal(), end_gregorian_date.toordinal()
+    merged = {}
+    for _, rows in sorted(parsed_pages, key=lambda item: item[0]):
+        for ordinal, high, low in rows:
+            if start <= ordinal <= end and ordinal not in merged:
+                merged[ordinal] = (high, low)
+    rows = RowBuffer()
+    for ordinal, (high, low) in sorted(merged.items(), reverse=True):
+        rows.add(ordinal, high, low, (high + low) // 2)
+    return rows
+
+
+def reparse_archive(cache, base_urls, start_gregorian_date, end_gregorian_date, parser="strainer", processes=None):
+    """
+    سطرهای بازه را بدون هیچ درخواست شبکه از صفحات موجود در کش دیسکی (tgju_cache.ResponseCache) می‌سازد:
+    {base_url: RowBuffer}. صفحات همه نمادها با هم در یک استخر پردازه تجزیه می‌شوند.
+    """
+    archived = {base_url: cache.series_pages(base_url) for base_url in dict.fromkeys(base_urls)}
+    parsed = parse_pages([task for tasks in archived.values() for task in tasks], parser, processes)
+    results = {}
+    offset = 0
+    for base_url, tasks in archived.items():
+        results[base_url] = merge_rows(parsed[offset:offset + len(tasks)], start_gregorian_date, end_gregorian_date)
+        offset += len(tasks)
+    return results
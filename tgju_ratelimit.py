@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+import time
+
+# --- کنترل تطبیقی نرخ درخواست (AIMD روی یک سطل توکن) ---
+
+
+class AdaptiveRateLimiter:
+    """
+    محدودیت نرخ درخواست یک میزبان به صورت سطل توکن (با ظرفیت burst) که نرخ آن با الگوی AIMD تنظیم می‌شود:
+    - هر پاسخ سالم و سریع نرخ را کمی بالا می‌برد (افزایش جمعی: حدود increase درخواست در ثانیه به ازای هر
+      rate پاسخ موفق)، تا سقف max_rate.
+    - پاسخ 429/503 نرخ را نصف و پاسخ کند (بیش از slow_after ثانیه) آن را ۲۰٪ کم می‌کند (کاهش ضربی)، حداکثر
+      یک بار در هر دوره کاهش تا چند پاسخ هم‌زمان از یک موج خطا نرخ را چند بار پشت سر هم کم نکنند.
+    - Retry-After سرور همه درخواست‌های بعدی این میزبان را تا آن زمان متوقف می‌کند.
+    rate=0 یعنی بدون محدودیت و بدون تطبیق.
+    """
+
+    def __init__(self, rate, min_rate=0.2, max_rate=10.0, burst=1, increase=1.0, slow_after=3.0):
+        self.adaptive = bool(rate)
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, min_rate), self.max_rate) if rate else 0.0
+        self.burst = max(1, burst)
+        self.increase = increase
+        self.slow_after = slow_after
+        self._lock = threading.Lock()
+        # زمان نظری رسیدن درخواست بعدی (GCRA، معادل سطل توکن)
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+    def wait(self, cancelled=None):
+        """تا رسیدن نوبت درخواست بعدی صبر می‌کند؛ False یعنی رویداد cancelled در این مدت فعال شده است."""
+        if not self.adaptive:
+            return not (cancelled is not None and cancelled.is_set())
+        with self._lock:
+            now = time.monotonic()
+            interval = 1.0 / self.rate
+            slot = max(now, self._next_slot - (self.burst - 1) * interval, self._blocked_until)
+            self._next_slot = max(self._next_slot, slot) + interval
+        delay = slot - now
+        if cancelled is None:
+            time.sleep(delay)
+            return True
+        return not cancelled.wait(delay)
+
+    def record(self, status, latency, retry_after=None):
+        """بازخورد یک پاسخ: کد وضعیت (یا None برای خطای اتصال/timeout)، زمان پاسخ و Retry-After بر حسب ثانیه."""
+        if not self.adaptive: return
+        with self._lock:
+            now = time.monotonic()
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            if status in (429, 503) or status is None:
+                self._decrease(now, 0.5)
+            elif latency > self.slow_after:
+                self._decrease(now, 0.8)
+            elif status is not None and status < 400:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def _decrease(self, now, factor):
+        # حداکثر یک کاهش در هر دوره (حداقل یک ثانیه یا فاصله فعلی دو درخواست)
+        if now - self._last_decrease < max(1.0, 1.0 / self.rate): return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * factor)
+
+
+# --- کلاس RateMemory: نگهداری نرخ یادگرفته‌شده هر میزبان بین اجراها ---
+class RateMemory:
+    def __init__(self, path="tgju_rate_state.json"):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, host):
+        """نرخ ذخیره‌شده میزبان یا None."""
+        entry = self._read().get(host)
+        return entry["rate"] if entry else None
+
+    def save(self, rates):
+        """rates: {میزبان: نرخ}"""
+        with self._lock:
+            state = self._read()
+            for host, rate in rates.items():
+                state[host] = {"rate": round(rate, 3), "updated": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=1)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,181 @@
+import datetime as dt
+import json
+from urllib.parse import urlencode
+
+import requests
+
+from tgju_batch import symbol_name
+from tgju_parsers import DATE_RE
+
+# --- منابع داده: از کجا و با چه قالبی سطرهای تاریخچه یک نماد دریافت شوند ---
+# هر منبع iter_pages(fetcher, base_url, start, end, first_page) دارد که مانند مسیر قبلی (شماره صفحه، سطرهای
+# PriceRow بازه) را از جدید به قدیم تولید می‌کند؛ سطرها در همه منابع با fetcher._process_rows ساخته می‌شوند
+# تا خروجی، هشدارها و شمارنده‌ها یکسان باشند. date_bounded=True یعنی ادامه پس از قطع (نقطه بازیابی) با
+# محدود کردن تاریخ پایان انجام می‌شود، نه با شماره صفحه. reset() در شروع هر اجرای fetcher فراخوانی می‌شود.
+
+
+class SourceError(IOError):
+    """پاسخ منبع قابل استفاده نیست (کد HTTP یا قالب غیرمنتظره)."""
+
+
+# --- کلاس HtmlPageSource: صفحات HTML تاریخچه (?p=N) ---
+class HtmlPageSource:
+    name = "html"
+    date_bounded = False
+
+    def reset(self):
+        pass
+
+    def iter_pages(self, fetcher, base_url, start_gregorian_date, end_gregorian_date, first_page=1):
+        return fetcher._iter_html_pages(base_url, start_gregorian_date, end_gregorian_date, first_page)
+
+
+# --- کلاس JsonFeedSource: فید جدولی JSON تاریخچه (DataTables سمت سرور) ---
+class JsonFeedSource:
+    """
+    هر درخواست page_size سطر از بازه [start, end] را به ترتیب نزولی تاریخ برمی‌گرداند؛ یک بازه ده‌ساله با
+    چند درخواست چند ده کیلوبایتی به جای صدها صفحه HTML دریافت می‌شود. قالب پاسخ:
+        {"recordsFiltered": N, "data": [[بازگشایی، کمترین، بیشترین، پایانی، تغییر، درصد، "YYYY/MM/DD"، شمسی], ...]}
+    شماره ستون‌ها قابل تنظیم است. اگر سرور پارامترهای from/to را نادیده بگیرد، سطرهای خارج از بازه مانند
+    صفحات HTML کنار گذاشته می‌شوند و فقط درخواست‌های بیشتری لازم است.
+    """
+
+    name = "json"
+    date_bounded = True
+    FEED_URL = "https://api.tgju.org/v1/market/indicator/summary-table-data/{symbol}"
+
+    def __init__(self, feed_url=FEED_URL, page_size=1000, date_column=6, high_column=2, low_column=1):
+        self.feed_url = feed_url
+        self.page_size = page_size
+        self.date_column = date_column
+        self.high_column = high_column
+        self.low_column = low_column
+
+    def reset(self):
+        pass
+
+    def page_url(self, base_url, start_gregorian_date, end_gregorian_date, page):
+        query = urlencode({
+            "lang": "en",
+            "order_dir": "desc",
+            "start": (page - 1) * self.page_size,
+            "length": self.page_size,
+            "from": start_gregorian_date.isoformat(),
+            "to": end_gregorian_date.isoformat(),
+            "convert_to_ad": 1,
+        })
+        return f"{self.feed_url.format(symbol=symbol_name(base_url))}?{query}"
+
+    def _rows(self, body):
+        """[(تاریخ میلادی، حداکثر، حداقل)] به صورت رشته، مانند خروجی parserهای HTML."""
+        try:
+            data = json.loads(body)["data"]
+        except (ValueError, KeyError, TypeError):
+            raise SourceError("پاسخ فید JSON قالب مورد انتظار را ندارد.")
+        if not isinstance(data, list):
+            raise SourceError("پاسخ فید JSON قالب مورد انتظار را ندارد.")
+        width = max(self.date_column, self.high_column, self.low_column) + 1
+        rows = []
+        for item in data:
+            if not isinstance(item, list) or len(item) < width:
+                raise SourceError("سطر فید JSON ستون‌های مورد انتظار را ندارد.")
+            date_str = str(item[self.date_column]).strip().replace("/", "-")
+            if not DATE_RE.match(date_str):
+                raise SourceError(f"تاریخ نامعتبر در فید JSON: {item[self.date_column]}")
+            high = str(item[self.high_column]).replace(",", "").strip()
+            low = str(item[self.low_column]).replace(",", "").strip()
+            # ستون‌های جابه‌جا (مثلا تغییر قالب فید) به جای عددهای اشتباه خطا می‌دهند تا auto به HTML برگردد
+            if high.isdigit() and low.isdigit() and int(high) < int(low):
+                raise SourceError(f"ستون‌های فید JSON با قالب مورد انتظار نمی‌خوانند (حداکثر کمتر از حداقل در {date_str}).")
+            rows.append((date_str, high, low))
+        return rows
+
+    def _download(self, fetcher, url, cancelled):
+        if not fetcher.transport.limiter_for(url).wait(cancelled): return None
+        try:
+            with fetcher.metrics.span("download", source=self.name):
+                response = fetcher.transport.get(url)
+        except requests.exceptions.RequestException as e:
+            raise IOError(f"خطا در ارتباط شبکه: {e}. لطفا اتصال اینترنت و آدرس URL را بررسی کنید.")
+        if response.status_code != 200:
+            raise SourceError(f"فید JSON پاسخ HTTP {response.status_code} داد.")
+        return response.content
+
+    def iter_pages(self, fetcher, base_url, start_gregorian_date, end_gregorian_date, first_page=1):
+        page = first_page
+        while not fetcher.stop_flag:
+            fetcher._update_status(f"در حال دریافت صفحه {page} فید JSON...")
+            url = self.page_url(base_url, start_gregorian_date, end_gregorian_date, page)
+            body = self._download(fetcher, url, fetcher.cancel_event)
+            if body is None or fetcher.stop_flag: break
+            with fetcher.metrics.span("parse", page=page, source=self.name):
+                parsed = self._rows(body)
+            page_rows, done = fetcher._process_rows(parsed, page, start_gregorian_date, end_gregorian_date)
+            if fetcher.stop_flag: break
+            yield page, page_rows
+            if done or len(parsed) < self.page_size: break
+            page += 1
+
+
+# --- کلاس AutoSource: فید JSON با صفحات HTML به عنوان جایگزین ---
+class AutoSource:
+    """
+    ابتدا primary (فید JSON)؛ اگر خطا دهد یا برای بازه هیچ سطری برنگرداند، بقیه بازه (قدیمی‌تر از آخرین سطر دریافت‌شده) از fallback (صفحات HTML)
+    گرفته می‌شود. میزبانی که فید آن یک بار از کار افتاده در همین اجرا دوباره امتحان نمی‌شود؛ reset() در
+    شروع اجرای بعدی (fetch_data، fetch_batch و ...) آن را دوباره فعال می‌کند تا یک خطای گذرا فید را برای
+    کل عمر fetcher (مثلا نشست رابط کاربری یا API) خاموش نکند.
+    """
+
+    name = "auto"
+    date_bounded = True
+
+    def __init__(self, primary=None, fallback=None):
+        self.primary = primary or JsonFeedSource()
+        self.fallback = fallback or HtmlPageSource()
+        self._failed = set()
+
+    def reset(self):
+        self._failed.clear()
+        self.primary.reset()
+        self.fallback.reset()
+
+    def iter_pages(self, fetcher, base_url, start_gregorian_date, end_gregorian_date, first_page=1):
+        page = 0
+        host = self.primary.page_url(base_url, start_gregorian_date, end_gregorian_date, 1).split("/")[2]
+        if host not in self._failed:
+            try:
+                received = False
+                for page, page_rows in self.primary.iter_pages(fetcher, base_url, start_gregorian_date,
+                                                               end_gregorian_date):
+                    if page_rows:
+                        received = True
+                        end_gregorian_date = page_rows[-1].gregorian_date - dt.timedelta(days=1)
+                    yield page, page_rows
+                if received or fetcher.stop_flag: return
+                # نام نماد در فید از آدرس صفحه حدس زده می‌شود؛ نام ناشناخته پاسخ 200 بدون سطر می‌گیرد
+                raise SourceError("فید JSON برای این نماد و بازه سطری برنگرداند.")
+            except IOError as e:
+                self._failed.add(host)
+                fetcher._update_status(f"هشدار: فید JSON در دسترس نیست ({e})؛ ادامه با صفحات HTML.")
+        if start_gregorian_date > end_gregorian_date: return
+        # شماره صفحات ادامه شماره‌های قبلی است تا برای مصرف‌کننده (نقطه بازیابی، پیشرفت) یکتا بماند
+        for html_page, page_rows in self.fallback.iter_pages(fetcher, base_url, start_gregorian_date,
+                                                             end_gregorian_date):
+            yield page + html_page, page_rows
+
+
+SOURCES = {
+    "html": HtmlPageSource,
+    "json": JsonFeedSource,
+    "auto": AutoSource,
+}
+
+
+def get_source(source):
+    """نام منبع (html، json یا auto) یا یک شیء منبع آماده."""
+    if not isinstance(source, str):
+        return source
+    try:
+        return SOURCES[source]()
+    except KeyError:
+        raise ValueError(f"منبع داده ناشناخته: {source}. گزینه‌های مجاز: {', '.join(SOURCES)}")
@@ -0,0 +1,198 @@
+import datetime as dt
+import sqlite3
+from array import array
+from collections import namedtuple
+from contextlib import contextmanager
+
+ONE_DAY = dt.timedelta(days=1)
+
+# یک سطر قیمت روزانه؛ همه مسیرها (استریم، ذخیره محلی، نقطه بازیابی، خروجی) همین قالب را استفاده می‌کنند
+PriceRow = namedtuple("PriceRow", ["gregorian_date", "high", "low", "average"])
+
+
+
+# --- کلاس RowBuffer: سطرهای قیمت به صورت ستونی و فشرده ---
+class RowBuffer:
+    """
+    جایگزین لیست PriceRowها برای جمع کردن سطرهای یک استخراج: چهار ستون array('q') (ordinal میلادی، حداکثر،
+    حداقل، میانگین)، یعنی ۳۲ بایت برای هر سطر به جای چند شیء پایتون. رشد آرایه‌ها سرشکن است و columns()
+    بدون کپی نمای numpy روی همین حافظه برمی‌گرداند؛ تا وقتی آن نماها وجود دارند بافر قابل افزودن نیست
+    (BufferError). پیمایش و اندیس PriceRow برمی‌گردانند تا مصرف‌کننده‌های قبلی تغییری لازم نداشته باشند.
+    """
+
+    __slots__ = ("ordinals", "high", "low", "average")
+
+    def __init__(self, rows=()):
+        self.ordinals = array("q")
+        self.high = array("q")
+        self.low = array("q")
+        self.average = array("q")
+        self.extend(rows)
+
+    def add(self, ordinal, high, low, average):
+        self.ordinals.append(ordinal)
+        self.high.append(high)
+        self.low.append(low)
+        self.average.append(average)
+
+    def append(self, row):
+        gdate, high, low, average = row
+        self.add(gdate.toordinal(), high, low, average)
+
+    def extend(self, rows):
+        if isinstance(rows, RowBuffer):
+            self.ordinals.extend(rows.ordinals)
+            self.high.extend(rows.high)
+            self.low.extend(rows.low)
+            self.average.extend(rows.average)
+        else:
+            for row in rows:
+                self.append(row)
+
+    def columns(self):
+        """(ordinal، حداکثر، حداقل، میانگین) به صورت آرایه‌های int64 numpy بدون کپی."""
+        import numpy as np
+        return tuple(np.frombuffer(col, dtype=np.int64)
+                     for col in (self.ordinals, self.high, self.low, self.average))
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def __getitem__(self, i):
+        return PriceRow(dt.date.fromordinal(self.ordinals[i]), self.high[i], self.low[i], self.average[i])
+
+    def __iter__(self):
+        for ordinal, high, low, average in zip(self.ordinals, self.high, self.low, self.average):
+            yield PriceRow(dt.date.fromordinal(ordinal), high, low, average)
+
+    def __eq__(self, other):
+        if not isinstance(other, RowBuffer): return NotImplemented
+        return (self.ordinals == other.ordinals and self.high == other.high and self.low == other.low
+                and self.average == other.average)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    symbol TEXT NOT NULL,
+    gdate TEXT NOT NULL,
+    high INTEGER NOT NULL,
+    low INTEGER NOT NULL,
+    average INTEGER NOT NULL,
+    PRIMARY KEY (symbol, gdate)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    symbol TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL
+);
+"""
+
+
+def normalize_symbol(base_url):
+    return base_url.strip().rstrip("/")
+
+
+def merge_ranges(ranges):
+    """بازه‌های [شروع، پایان] هم‌پوشان یا چسبیده به هم را ادغام می‌کند."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + ONE_DAY:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def split_range(start, end, days):
+    """بازه [start, end] بدون تاریخ‌های days، به صورت لیست بازه‌ها."""
+    ranges = []
+    cursor = start
+    for day in sorted(d for d in set(days) if start <= d <= end):
+        if cursor < day:
+            ranges.append((cursor, day - ONE_DAY))
+        cursor = day + ONE_DAY
+    if cursor <= end:
+        ranges.append((cursor, end))
+    return ranges
+
+
+# --- کلاس PriceStore: ذخیره محلی قیمت‌ها در SQLite ---
+class PriceStore:
+    """
+    قیمت‌ها با کلید (آدرس نماد، تاریخ میلادی) ذخیره می‌شوند. جدول coverage بازه‌هایی را نگه می‌دارد
+    که کامل استخراج شده‌اند، تا روزهای تعطیل (بدون سطر) دوباره درخواست نشوند.
+    """
+
+    def __init__(self, path="tgju_prices.sqlite3"):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # هر عملیات اتصال خودش را باز می‌کند تا استفاده از تردهای مختلف مشکلی نداشته باشد
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def coverage(self, base_url):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT start_date, end_date FROM coverage WHERE symbol = ?",
+                                (normalize_symbol(base_url),)).fetchall()
+        return merge_ranges((dt.date.fromisoformat(s), dt.date.fromisoformat(e)) for s, e in rows)
+
+    def missing_ranges(self, base_url, start_date, end_date):
+        """بخش‌هایی از بازه [start_date, end_date] که هنوز در حافظه محلی پوشش داده نشده‌اند."""
+        missing = []
+        cursor = start_date
+        for cov_start, cov_end in self.coverage(base_url):
+            if cov_end < cursor: continue
+            if cov_start > end_date: break
+            if cov_start > cursor:
+                missing.append((cursor, cov_start - ONE_DAY))
+            cursor = cov_end + ONE_DAY
+            if cursor > end_date: break
+        if cursor <= end_date:
+            missing.append((cursor, end_date))
+        return missing
+
+    def version(self, base_url):
+        """امضای ارزان داده‌های یک نماد (تعداد سطرها، جدیدترین تاریخ، جمع قیمت‌ها) برای تشخیص تغییر."""
+        with self._connect() as conn:
+            return tuple(conn.execute("SELECT COUNT(*), MAX(gdate), TOTAL(high + low) FROM prices WHERE symbol = ?",
+                                      (normalize_symbol(base_url),)).fetchone())
+
+    def save(self, base_url, rows, covered_start, covered_end, gaps=()):
+        """
+        سطرهای PriceRow را درج/به‌روزرسانی و بازه پوشش را ثبت می‌کند؛ تاریخ‌های gaps (مثلا روزهایی که بررسی
+        یکپارچگی نتوانست سطرشان را بگیرد) از پوشش کنار گذاشته می‌شوند.
+        """
+        symbol = normalize_symbol(base_url)
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO prices (symbol, gdate, high, low, average) VALUES (?, ?, ?, ?, ?)",
+                ((symbol, gdate.isoformat(), high, low, avg) for gdate, high, low, avg in rows))
+            covered = split_range(covered_start, covered_end, gaps)
+            if covered:
+                existing = conn.execute("SELECT start_date, end_date FROM coverage WHERE symbol = ?", (symbol,)).fetchall()
+                ranges = [(dt.date.fromisoformat(s), dt.date.fromisoformat(e)) for s, e in existing]
+                ranges.extend(covered)
+                conn.execute("DELETE FROM coverage WHERE symbol = ?", (symbol,))
+                conn.executemany("INSERT INTO coverage (symbol, start_date, end_date) VALUES (?, ?, ?)",
+                                 ((symbol, s.isoformat(), e.isoformat()) for s, e in merge_ranges(ranges)))
+
+    def load(self, base_url, start_date, end_date):
+        """سطرهای ذخیره‌شده بازه را به ترتیب تاریخ در یک RowBuffer برمی‌گرداند."""
+        rows = RowBuffer()
+        with self._connect() as conn:
+            # julianday(0001-01-01) = 1721425.5 و ordinal همان روز ۱ است؛ بدون ساخت شیء date برای هر سطر
+            cursor = conn.execute(
+                "SELECT CAST(julianday(gdate) - 1721424.5 AS INTEGER), high, low, average FROM prices "
+                "WHERE symbol = ? AND gdate BETWEEN ? AND ? ORDER BY gdate",
+                (normalize_symbol(base_url), start_date.isoformat(), end_date.isoformat()))
+            for ordinal, high, low, avg in cursor:
+                rows.add(ordinal, high, low, avg)
+        return rows
@@ -0,0 +1,125 @@
+import datetime as dt
+import time
+
+import jdatetime
+import numpy as np
+import pandas as pd
+
+from tgju_store import RowBuffer
+
+# --- مرحله پردازش نهایی: تبدیل سطرهای خام به جدول خروجی به صورت برداری ---
+
+OUTPUT_COLUMNS = ["تاریخ", "حداقل", "حداکثر", "میانگین", "روند"]
+# کد روند = np.sign(تفاضل) + 1 ؛ کد 3 برای روز اول که روز قبلی برای مقایسه ندارد
+TREND_LABELS = ["نزولی", "بدون تغییر", "صعودی", "---"]
+
+
+def jalali_components(ordinals):
+    """
+    تبدیل برداری ordinal میلادی به (سال، ماه، روز) شمسی.
+    فقط ابتدای هر سال شمسی (۱ فروردین) با jdatetime محاسبه می‌شود؛ بقیه با جستجوی دودویی روی
+    همین جدول کوچک و طول ثابت ماه‌ها (۶ ماه ۳۱ روزه، ۵ ماه ۳۰ روزه، اسفند) به دست می‌آید.
+    """
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    first_year = jdatetime.date.fromgregorian(date=dt.date.fromordinal(int(ordinals.min()))).year
+    last_year = jdatetime.date.fromgregorian(date=dt.date.fromordinal(int(ordinals.max()))).year
+    years = np.arange(first_year, last_year + 1)
+    year_starts = np.array([jdatetime.date(int(y), 1, 1).togregorian().toordinal() for y in years], dtype=np.int64)
+
+    idx = np.searchsorted(year_starts, ordinals, side="right") - 1
+    day_of_year = ordinals - year_starts[idx]
+    first_half = day_of_year < 186
+    month = np.where(first_half, day_of_year // 31 + 1, (day_of_year - 186) // 30 + 7)
+    day = np.where(first_half, day_of_year % 31 + 1, (day_of_year - 186) % 30 + 1)
+    return years[idx], month, day
+
+
+def jalali_iso_strings(ordinals):
+    """رشته‌های YYYY-MM-DD شمسی، معادل jdatetime.date.isoformat برای هر ordinal."""
+    year, month, day = jalali_components(ordinals)
+    packed = pd.Series(year * 10000 + month * 100 + day).astype(str)
+    return (packed.str[:4] + "-" + packed.str[4:6] + "-" + packed.str[6:]).to_numpy()
+
+
+def jalali_ordinals(jalali):
+    """
+    عکس jalali_iso_strings: رشته‌های YYYY-MM-DD شمسی (مثلا ستون تاریخ جدول خروجی) -> ordinal میلادی.
+    مانند jalali_components فقط ابتدای هر سال شمسی با jdatetime محاسبه می‌شود.
+    """
+    parts = pd.Series(jalali, dtype=str).str
+    year = parts[:4].astype(np.int64).to_numpy()
+    month = parts[5:7].astype(np.int64).to_numpy()
+    day = parts[8:10].astype(np.int64).to_numpy()
+    if len(year) == 0:
+        return np.empty(0, dtype=np.int64)
+    years = np.arange(year.min(), year.max() + 1)
+    year_starts = np.array([jdatetime.date(int(y), 1, 1).togregorian().toordinal() for y in years], dtype=np.int64)
+    day_of_year = np.where(month <= 6, (month - 1) * 31, 186 + (month - 7) * 30) + day - 1
+    return year_starts[year - years[0]] + day_of_year
+
+
+def trend_labels(average):
+    """برچسب روند هر روز نسبت به روز قبل، به صورت Categorical."""
+    codes = np.full(len(average), 3, dtype=np.int8)
+    if len(average) > 1:
+        codes[1:] = np.sign(np.diff(np.asarray(average, dtype=np.int64))) + 1
+    return pd.Categorical.from_codes(codes, categories=TREND_LABELS)
+
+
+def _sorted_unique_columns(all_data):
+    """
+    ستون‌های (ordinal، حداکثر، حداقل، میانگین) به ترتیب صعودی تاریخ و بدون تاریخ تکراری.
+    سطرهای استخراج از جدید به قدیم (ترتیب صفحات سایت) و سطرهای حافظه محلی از قدیم به جدید هستند؛ در این دو
+    حالت فقط نمای معکوس یا همان نمای بافر برگردانده می‌شود و کپی‌ای ساخته نمی‌شود.
+    """
+    if not isinstance(all_data, RowBuffer):
+        all_data = RowBuffer(all_data)
+    columns = all_data.columns()
+    ordinals = columns[0]
+    if len(ordinals) < 2 or (ordinals[1:] > ordinals[:-1]).all():
+        return columns
+    if (ordinals[1:] < ordinals[:-1]).all():
+        return tuple(col[::-1] for col in columns)
+    # np.unique اولین وقوع هر تاریخ را نگه می‌دارد و خروجی را مرتب می‌کند (معادل drop_duplicates + sort_values)
+    ordinals, first_index = np.unique(ordinals, return_index=True)
+    return (ordinals,) + tuple(col[first_index] for col in columns[1:])
+
+
+def range_columns(all_data, start_gregorian_date, end_gregorian_date):
+    """ستون‌های (ordinal، حداکثر، حداقل، میانگین) مرتب، بدون تکرار و محدود به بازه."""
+    ordinals, high, low, average = _sorted_unique_columns(all_data)
+    # ستون‌ها مرتب‌اند، پس محدود کردن به بازه یک برش (نما) است
+    lo = np.searchsorted(ordinals, start_gregorian_date.toordinal(), side="left")
+    hi = np.searchsorted(ordinals, end_gregorian_date.toordinal(), side="right")
+    return ordinals[lo:hi], high[lo:hi], low[lo:hi], average[lo:hi]
+
+
+def build_output_frame(all_data, start_gregorian_date, end_gregorian_date, metrics=None, indicators=False):
+    """
+    سطرهای [gdate, high, low, avg] (لیست یا tgju_store.RowBuffer) را حذف تکراری، مرتب و به بازه محدود می‌کند
+    و جدول خروجی (تاریخ شمسی، حداقل، حداکثر، میانگین، روند) را برمی‌گرداند. ستون‌های عددی جدول برای
+    RowBuffer نمای همان بافر هستند. indicators=True ستون‌های شاخص (tgju_indicators.daily_indicators) را
+    بعد از روند اضافه می‌کند.
+    metrics (tgju_metrics.Metrics) در صورت وجود زمان تبدیل تاریخ شمسی را با نام jalali ثبت می‌کند.
+    """
+    ordinals, high, low, average = range_columns(all_data, start_gregorian_date, end_gregorian_date)
+    if len(ordinals) == 0:
+        if indicators:
+            from tgju_indicators import indicator_columns
+            return pd.DataFrame(columns=OUTPUT_COLUMNS + indicator_columns())
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    t0 = time.perf_counter()
+    jalali = jalali_iso_strings(ordinals)
+    if metrics is not None:
+        metrics.observe("jalali", time.perf_counter() - t0, rows=len(ordinals))
+    columns = {
+        "تاریخ": jalali,
+        "حداقل": low,
+        "حداکثر": high,
+        "میانگین": average,
+        "روند": trend_labels(average),
+    }
+    if indicators:
+        from tgju_indicators import daily_indicators
+        columns.update(daily_indicators(average))
+    return pd.DataFrame(columns, copy=False)
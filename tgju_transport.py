@@ -0,0 +1,192 @@
+import email.utils
+import random
+import threading
+import time
+from concurrent import futures
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tgju_jobs import CancelEvent, Cancelled
+from tgju_metrics import Metrics
+from tgju_ratelimit import AdaptiveRateLimiter
+
+try:
+    import brotli  # noqa: F401  (urllib3 فقط در صورت نصب بودن brotli پاسخ br را باز می‌کند)
+    ACCEPT_ENCODING = "gzip, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def retry_after_seconds(value):
+    """مقدار هدر Retry-After (تعداد ثانیه یا تاریخ HTTP) بر حسب ثانیه، یا None."""
+    if not value: return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+# --- کلاس TGJUTransport: لایه HTTP با اتصال‌های ماندگار و تلاش مجدد ---
+class TGJUTransport:
+    HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Encoding": ACCEPT_ENCODING}
+
+    def __init__(self, max_connections_per_host=8, max_retries=3, backoff_base=0.5, backoff_cap=10.0,
+                 timeout=15, retry_callback=None, cache=None, metrics=None, requests_per_second=2.0,
+                 max_requests_per_second=10.0, rate_memory=None, cancel_event=None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.retry_callback = retry_callback
+        # کش دیسکی پاسخ‌ها (tgju_cache.ResponseCache)؛ None یعنی هر بار از شبکه
+        self.cache = cache
+        # اندازه‌گیری درخواست‌ها، حجم و تلاش‌های مجدد (tgju_metrics.Metrics)
+        self.metrics = metrics if metrics is not None else Metrics()
+        # نرخ اولیه هر میزبان: نرخ یادگرفته‌شده در اجرای قبلی (tgju_ratelimit.RateMemory) یا requests_per_second
+        self.requests_per_second = requests_per_second
+        self.max_requests_per_second = max_requests_per_second
+        self.rate_memory = rate_memory
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+        # فعال شدن این رویداد درخواست‌های در حال انتظار و تأخیرهای تلاش مجدد را فوراً با Cancelled قطع می‌کند
+        self.cancel_event = cancel_event if cancel_event is not None else CancelEvent()
+        self._max_connections = max_connections_per_host
+        self._io_pool = None
+        self._io_pool_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        # هر میزبان یک استخر اتصال keep-alive با حداکثر max_connections_per_host اتصال دارد
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections_per_host, pool_block=True, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def limiter_for(self, url):
+        """محدودکننده تطبیقی نرخ میزبان این آدرس (برای هر میزبان یکی، مشترک بین همه تردها و اجراها)."""
+        host = urlparse(url).netloc
+        with self._limiters_lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                rate = self.requests_per_second
+                if rate and self.rate_memory is not None:
+                    rate = self.rate_memory.load(host) or rate
+                limiter = AdaptiveRateLimiter(rate, max_rate=self.max_requests_per_second)
+                self._limiters[host] = limiter
+            return limiter
+
+    def save_rates(self):
+        """نرخ فعلی میزبان‌ها برای اجرای بعدی ذخیره می‌شود."""
+        if self.rate_memory is None: return
+        with self._limiters_lock:
+            rates = {host: limiter.rate for host, limiter in self._limiters.items() if limiter.adaptive}
+        if rates:
+            self.rate_memory.save(rates)
+
+    def _send(self, url, headers):
+        """
+        درخواست در استخر تردهای I/O اجرا و پاسخ با بررسی مداوم رویداد لغو منتظر می‌ماند. requests راهی برای
+        قطع امن یک recv در حال انتظار ندارد؛ با لغو، درخواست رها می‌شود و در پس‌زمینه تا timeout تمام می‌شود.
+        """
+        if self.cancel_event.is_set(): raise Cancelled()
+        with self._io_pool_lock:
+            if self._io_pool is None:
+                self._io_pool = futures.ThreadPoolExecutor(max_workers=self._max_connections * 2,
+                                                           thread_name_prefix="tgju-io")
+            future = self._io_pool.submit(self.session.get, url, headers=headers, timeout=self.timeout)
+        while True:
+            try:
+                return future.result(timeout=0.05)
+            except futures.TimeoutError:
+                if self.cancel_event.is_set():
+                    future.cancel()
+                    raise Cancelled()
+
+    def _backoff_delay(self, attempt):
+        # backoff نمایی با jitter کامل تا درخواست‌های هم‌زمان پشت سر هم تکرار نشوند
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url, headers=None):
+        """
+        پاسخ را برمی‌گرداند؛ خطاهای گذرا (429، 5xx و timeout) چند بار با تأخیر تکرار می‌شوند و اگر سرور
+        Retry-After فرستاده باشد حداقل همان مدت صبر می‌شود. نتیجه هر درخواست به محدودکننده نرخ میزبان
+        گزارش می‌شود (نوبت‌گیری از محدودکننده با فراخواننده است).
+        """
+        limiter = self.limiter_for(url)
+        attempt = 0
+        while True:
+            t0 = time.perf_counter()
+            retry_after = None
+            try:
+                response = self._send(url, headers)
+                elapsed = time.perf_counter() - t0
+                if response.status_code in RETRY_STATUS_CODES:
+                    retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+                limiter.record(response.status_code, elapsed, retry_after)
+                # requests امکان جدا کردن DNS/اتصال را نمی‌دهد؛ elapsed زمان تا دریافت هدرهای پاسخ است
+                self.metrics.observe("http", elapsed, status=response.status_code)
+                self.metrics.observe("ttfb", response.elapsed.total_seconds())
+                self.metrics.count("requests", status=response.status_code)
+                self.metrics.count("bytes", len(response.content), source="network")
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                if attempt >= self.max_retries:
+                    response.raise_for_status()
+                reason = f"HTTP {response.status_code}"
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                limiter.record(None, time.perf_counter() - t0)
+                self.metrics.count("requests", status=type(e).__name__)
+                if attempt >= self.max_retries:
+                    raise
+                reason = type(e).__name__
+            delay = max(self._backoff_delay(attempt), retry_after or 0.0)
+            attempt += 1
+            self.metrics.count("retries", reason=reason)
+            if self.retry_callback:
+                self.retry_callback(url, attempt, reason, delay)
+            if self.cancel_event.wait(delay): raise Cancelled()
+
+    def get_text(self, url, revalidate=False, refresh=False):
+        """
+        متن صفحه؛ اگر کش دیسکی تنظیم شده باشد ابتدا از کش و در صورت نیاز با درخواست شرطی.
+        revalidate=True حتی نسخه تازه کش را هم با درخواست شرطی بررسی می‌کند (پاسخ 304 بدون بدنه).
+        refresh=True کش را نادیده می‌گیرد و با درخواست بدون شرط ورودی کش را جایگزین می‌کند (مثلا دریافت دوباره
+        صفحه‌ای که ناقص ذخیره شده است).
+        """
+        if self.cache is None:
+            return self.get(url).text
+        cached = None if refresh else self.cache.lookup(url)
+        if cached is not None:
+            body, encoding, fresh, conditional_headers = cached
+            if fresh and not revalidate:
+                self.metrics.count("cache", result="fresh")
+                self.metrics.count("bytes", len(body), source="cache")
+                return body.decode(encoding or "utf-8", errors="replace")
+            response = self.get(url, headers=conditional_headers or None)
+            if response.status_code == 304:
+                self.metrics.count("cache", result="revalidated")
+                self.metrics.count("bytes", len(body), source="cache")
+                self.cache.touch(url)
+                return body.decode(encoding or "utf-8", errors="replace")
+            self.metrics.count("cache", result="changed")
+        else:
+            self.metrics.count("cache", result="refresh" if refresh else "miss")
+            response = self.get(url)
+        if response.status_code == 200:
+            self.cache.store(url, response.content, response.encoding or response.apparent_encoding,
+                             response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return response.text
+
+    def close(self):
+        with self._io_pool_lock:
+            if self._io_pool is not None:
+                self._io_pool.shutdown(wait=False, cancel_futures=True)
+                self._io_pool = None
+        self.session.close()